@@ -1,7 +1,29 @@
+import importlib
 import logging
 
 from mintapi.api import *
-from mintapi.signIn import *
+from mintapi.aio import AsyncMint
+from mintapi.models import (
+    Account,
+    Budget,
+    Category,
+    Investment,
+    Record,
+    Transaction,
+    Trend,
+)
+from mintapi.store import JSONTransactionStore, SQLiteStore, TransactionStore
+from mintapi.sync import SyncStatus
 
 
 logging.getLogger("mintapi").setLevel(logging.INFO)
+
+
+def __getattr__(name):
+    # The sign in helpers (mintapi.signIn) import selenium, so they are only
+    # loaded the first time one of them is looked up.
+    if not name.startswith("_"):
+        signIn = importlib.import_module("mintapi.signIn")
+        if hasattr(signIn, name):
+            return getattr(signIn, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,102 @@
+"""
+asyncio helper classes
+
+``AsyncMint`` exposes the data accessors of a signed in ``Mint`` as coroutines
+so that several endpoints can be fetched together with ``asyncio.gather``.  The
+blocking HTTP calls run on a bounded thread pool that shares the pooled
+``SessionTransport`` connections of the wrapped client.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from mintapi.api import Mint
+from mintapi.transport import DEFAULT_POOL_MAXSIZE
+
+
+class AsyncMint:
+    """
+    asyncio front end for a ``Mint`` client
+
+    Requests are only sent concurrently when the client uses the session
+    transport; a browser-backed client is not thread safe, so its calls are
+    serialised on a single worker.
+
+    Parameters
+    ----------
+    mint : Mint
+        signed in client
+    max_workers : int, optional
+        maximum number of requests in flight, by default the transport pool size
+    """
+
+    def __init__(self, mint, max_workers=DEFAULT_POOL_MAXSIZE):
+        self.mint = mint
+        if not mint.supports_concurrent_requests:
+            max_workers = 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mintapi"
+        )
+
+    @classmethod
+    async def create(cls, *args, max_workers=DEFAULT_POOL_MAXSIZE, **kwargs):
+        """
+        Signs in without blocking the event loop.  Arguments are passed to
+        ``Mint``; the session transport is enabled unless stated otherwise.
+        """
+        kwargs.setdefault("session_transport", True)
+        loop = asyncio.get_running_loop()
+        mint = await loop.run_in_executor(
+            None, functools.partial(Mint, *args, **kwargs)
+        )
+        return cls(mint, max_workers=max_workers)
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def get_account_data(self, *args, **kwargs):
+        return await self._run(self.mint.get_account_data, *args, **kwargs)
+
+    async def get_bills(self):
+        return await self._run(self.mint.get_bills)
+
+    async def get_budget_data(self, *args, **kwargs):
+        return await self._run(self.mint.get_budget_data, *args, **kwargs)
+
+    async def get_category_data(self, *args, **kwargs):
+        return await self._run(self.mint.get_category_data, *args, **kwargs)
+
+    async def get_credit_report_data(self, *args, **kwargs):
+        return await self._run(self.mint.get_credit_report_data, *args, **kwargs)
+
+    async def get_credit_score_data(self):
+        return await self._run(self.mint.get_credit_score_data)
+
+    async def get_investment_data(self, *args, **kwargs):
+        return await self._run(self.mint.get_investment_data, *args, **kwargs)
+
+    async def get_net_worth_data(self, account_data=None):
+        if account_data is None:
+            account_data = await self.get_account_data()
+        return self.mint.get_net_worth_data(account_data)
+
+    async def get_transaction_data(self, *args, **kwargs):
+        return await self._run(self.mint.get_transaction_data, *args, **kwargs)
+
+    async def get_trend_data(self, *args, **kwargs):
+        return await self._run(self.mint.get_trend_data, *args, **kwargs)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.mint.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
@@ -1,12 +1,26 @@
+import functools
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from dateutil.relativedelta import relativedelta
 
-from mintapi import constants
-from mintapi.signIn import _create_web_driver_at_mint_com, sign_in
+from mintapi import constants, imap
+from mintapi.cache import ResponseCache
+from mintapi.columnar import import_pyarrow, to_arrow_table
+from mintapi.models import MODELS
+from mintapi.session import (
+    DEFAULT_SESSION_TTL,
+    delete_session,
+    load_session,
+    save_session,
+)
+from mintapi.streaming import STREAM_CHUNK_SIZE, iter_json_array
+from mintapi.sync import SyncStatus
 from mintapi.transactions import TransactionRequest
+from mintapi.transport import SessionTransport
 from mintapi.trends import ReportView, TrendRequest
 
 from mintapi.filters import (
@@ -16,10 +30,21 @@ from mintapi.filters import (
     DescriptionNameFilter,
     SearchFilter,
     TagIdFilter,
+    TransactionStatusFilter,
+    TransactionTypeFilter,
 )
 
 logger = logging.getLogger("mintapi")
 
+AUTH_ERROR_STATUS_CODES = (401, 403)
+
+SHARD_MONTHS = {"month": 1, "quarter": 3}
+
+PENDING_STATUS = "PENDING"
+INVESTMENT_TRANSACTION_TYPE = "InvestmentTransaction"
+
+# cacheTTL is the number of seconds a response may be served from the response
+# cache; None disables caching for the endpoint.
 ENDPOINTS = {
     constants.ACCOUNT_KEY: {
         "apiVersion": "pfm/v1",
@@ -28,6 +53,7 @@ ENDPOINTS = {
         "endingDate": None,
         "includeCreatedDate": True,
         "includeUpdatedDate": True,
+        "cacheTTL": 60 * 60,
     },
     constants.BUDGET_KEY: {
         "apiVersion": "pfm/v1",
@@ -36,6 +62,7 @@ ENDPOINTS = {
         "endingDate": "endDate",
         "includeCreatedDate": True,
         "includeUpdatedDate": True,
+        "cacheTTL": 60 * 60,
     },
     constants.CATEGORY_KEY: {
         "apiVersion": "pfm/v1",
@@ -44,6 +71,7 @@ ENDPOINTS = {
         "endingDate": None,
         "includeCreatedDate": False,
         "includeUpdatedDate": True,
+        "cacheTTL": 24 * 60 * 60,
     },
     constants.INVESTMENT_KEY: {
         "apiVersion": "pfm/v1",
@@ -52,6 +80,7 @@ ENDPOINTS = {
         "endingDate": None,
         "includeCreatedDate": False,
         "includeUpdatedDate": True,
+        "cacheTTL": 60 * 60,
     },
     constants.TRANSACTION_KEY: {
         "apiVersion": "pfm/v1",
@@ -60,6 +89,7 @@ ENDPOINTS = {
         "endingDate": "toDate",
         "includeCreatedDate": False,
         "includeUpdatedDate": True,
+        "cacheTTL": None,
     },
     constants.TRENDS_KEY: {
         "apiVersion": "pfm/v1",
@@ -68,10 +98,25 @@ ENDPOINTS = {
         "endingDate": "toDate",
         "includeCreatedDate": False,
         "includeUpdatedDate": False,
+        "cacheTTL": None,
     },
 }
 
 
+# mintapi.signIn pulls in selenium, which takes longer to import than the rest
+# of the package together, so it is only loaded once a browser is needed.
+def _create_web_driver_at_mint_com(*args, **kwargs):
+    from mintapi import signIn
+
+    return signIn._create_web_driver_at_mint_com(*args, **kwargs)
+
+
+def sign_in(*args, **kwargs):
+    from mintapi import signIn
+
+    return signIn.sign_in(*args, **kwargs)
+
+
 def convert_mmddyy_to_datetime(date):
     try:
         newdate = datetime.strptime(date, "%m/%d/%y")
@@ -80,6 +125,26 @@ def convert_mmddyy_to_datetime(date):
     return newdate
 
 
+def split_date_range(start_date, end_date, months):
+    """
+    Splits the inclusive range [start_date, end_date] into consecutive windows
+    aligned to calendar periods of `months` months (1 = month, 3 = quarter).
+    """
+    if start_date is None or end_date is None:
+        raise ValueError("Sharding requires both a start and an end date")
+    windows = []
+    window_start = start_date
+    while window_start <= end_date:
+        period_month = (window_start.month - 1) // months * months + 1
+        next_period = window_start.replace(day=1, month=period_month) + relativedelta(
+            months=months
+        )
+        window_end = min(end_date, next_period - relativedelta(days=1))
+        windows.append((window_start, window_end))
+        window_start = next_period
+    return windows
+
+
 def reverse_credit_amount(row):
     amount = float(row["amount"][1:].replace(",", ""))
     return amount if row["isDebit"] else -amount
@@ -89,9 +154,26 @@ class MintException(Exception):
     pass
 
 
+class _RecordCounter:
+    """Iterates over a page of records, counting them as they go by."""
+
+    def __init__(self, records):
+        self.records = records
+        self.count = 0
+
+    def __iter__(self):
+        for record in self.records:
+            self.count += 1
+            yield record
+
+
 class Mint(object):
     driver = None
     status_message = None
+    sync_status = None
+    transport = None
+    response_cache = None
+    email = None
 
     def __init__(
         self,
@@ -112,11 +194,27 @@ class Mint(object):
         fail_if_stale=False,
         use_chromedriver_on_path=False,
         chromedriver_download_path=os.getcwd(),
+        chromedriver_version_ttl=None,
+        chrome_arguments=None,
         driver=None,
         beta=False,
+        session_transport=False,
+        reuse_session=False,
+        session_ttl=DEFAULT_SESSION_TTL,
+        response_cache=None,
+        sync_in_background=False,
+        sync_progress_callback=None,
     ):
         self.driver = None
         self.status_message = None
+        self.sync_status = None
+        self.transport = None
+        self.response_cache = response_cache
+        self.email = None
+        self._api_key_header = None
+        # Serialises use of the driver, which the background sync watch
+        # shares with requests.
+        self._driver_lock = threading.RLock()
 
         if email and password:
             self.login_and_get_token(
@@ -137,32 +235,105 @@ class Mint(object):
                 fail_if_stale=fail_if_stale,
                 use_chromedriver_on_path=use_chromedriver_on_path,
                 chromedriver_download_path=chromedriver_download_path,
+                chromedriver_version_ttl=chromedriver_version_ttl,
+                chrome_arguments=chrome_arguments,
                 driver=driver,
                 beta=beta,
+                session_transport=session_transport,
+                reuse_session=reuse_session,
+                session_ttl=session_ttl,
+                sync_in_background=sync_in_background,
+                sync_progress_callback=sync_progress_callback,
             )
 
     def _get_api_key_header(self):
+        # The header is built once per session and only re-derived from the
+        # browser after Mint rejects it (see _authorized_request).
+        if self._api_key_header is None:
+            self._api_key_header = self._derive_api_key_header()
+        return self._api_key_header
+
+    def _derive_api_key_header(self):
         key_var = "window.__shellInternal.appExperience.appApiKey"
-        api_key = self.driver.execute_script("return " + key_var)
+        with self._driver_lock:
+            api_key = self.driver.execute_script("return " + key_var)
         auth = "Intuit_APIKey intuit_apikey=" + api_key
         auth += ", intuit_apikey_version=1.0"
         header = {"authorization": auth}
         header.update(constants.JSON_HEADER)
         return header
 
+    @property
+    def api_key_header_cached(self):
+        """Whether an authorization header is currently cached for this session."""
+        return self._api_key_header is not None
+
+    def invalidate_api_key_header(self):
+        """Drops the cached authorization header so the next request re-derives it."""
+        self._api_key_header = None
+
     def close(self):
         """Logs out and quits the current web driver/selenium session."""
-        if not self.driver:
-            return
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
 
-        self.driver.quit()
-        self.driver = None
+        self.close_driver()
+
+    def close_driver(self):
+        """
+        Quits the web driver/selenium session only.  When using the session
+        transport, data calls keep working over the copied session cookies.
+        """
+        with self._driver_lock:
+            if not self.driver:
+                return
+
+            self.driver.quit()
+            self.driver = None
+
+    def use_session_transport(self, **kwargs):
+        """
+        Copies the cookies and API key of the signed in driver into a pooled
+        keep-alive HTTP session and routes all further requests through it.
+        """
+        # Cache the API key while the driver is still available.
+        with self._driver_lock:
+            self._get_api_key_header()
+            self.transport = SessionTransport.from_driver(self.driver, **kwargs)
+        return self.transport
+
+    @property
+    def supports_concurrent_requests(self):
+        """Whether requests may be sent from several threads at once."""
+        # The selenium driver is not thread safe; a requests.Session is.
+        return self.transport is not None
+
+    def _request(self, method, url, **kwargs):
+        if self.transport is not None:
+            return self.transport.request(method, url, **kwargs)
+        with self._driver_lock:
+            return self.driver.request(method, url, **kwargs)
+
+    def _authorized_request(self, method, url, headers=None, **kwargs):
+        if headers is None:
+            headers = self._get_api_key_header()
+        response = self._request(method, url, headers=headers, **kwargs)
+        if response.status_code in AUTH_ERROR_STATUS_CODES and self.driver is not None:
+            # The API key may have been rotated; re-derive it and retry once.
+            # A streamed response holds its pooled connection until closed.
+            response.close()
+            self.invalidate_api_key_header()
+            response = self._request(
+                method, url, headers=self._get_api_key_header(), **kwargs
+            )
+        return response
 
     def get(self, url, **kwargs):
-        return self.driver.request("GET", url, **kwargs)
+        return self._request("GET", url, **kwargs)
 
     def post(self, url, **kwargs):
-        return self.driver.request("POST", url, **kwargs)
+        return self._request("POST", url, **kwargs)
 
     def login_and_get_token(
         self,
@@ -183,13 +354,46 @@ class Mint(object):
         fail_if_stale=False,
         use_chromedriver_on_path=False,
         chromedriver_download_path=os.getcwd(),
+        chromedriver_version_ttl=None,
+        chrome_arguments=None,
         driver=None,
         beta=False,
+        session_transport=False,
+        reuse_session=False,
+        session_ttl=DEFAULT_SESSION_TTL,
+        sync_in_background=False,
+        sync_progress_callback=None,
     ):
+        # Scopes response cache entries to this login.
+        self.email = email
+        reuse_session = reuse_session and session_path is not None
+        if reuse_session and driver is None and self.restore_session(session_path):
+            logger.info("Reusing saved Mint session; skipping browser sign in")
+            return
 
-        self.driver = driver or _create_web_driver_at_mint_com(
-            headless, session_path, use_chromedriver_on_path, chromedriver_download_path
-        )
+        imap_client_future = None
+        if imap_account:
+            # Log in to IMAP while the browser starts and signs in.
+            imap_client_future = imap.connect_in_background(
+                imap_server, imap_account, imap_password
+            )
+
+        try:
+            self.driver = driver or _create_web_driver_at_mint_com(
+                headless,
+                session_path,
+                use_chromedriver_on_path,
+                chromedriver_download_path,
+                chromedriver_version_ttl,
+                chrome_arguments,
+            )
+        except Exception:
+            if imap_client_future is not None:
+                imap.close_in_background(imap_client_future)
+            raise
+
+        if wait_for_sync and sync_in_background:
+            self.sync_status = SyncStatus(sync_progress_callback)
 
         try:
             self.status_message = sign_in(
@@ -208,15 +412,89 @@ class Mint(object):
                 imap_server,
                 imap_folder,
                 beta,
+                imap_client_future,
+                self.sync_status,
+                self._driver_lock,
             )
         except Exception as e:
             msg = f"Could not sign in to Mint. Current page: {self.driver.current_url}"
             logger.exception(e)
             self.driver.quit()
             self.driver = None
+            self.sync_status = None
             raise Exception(msg) from e
 
+        if session_transport or reuse_session:
+            self.use_session_transport()
+        if reuse_session:
+            save_session(
+                session_path,
+                self.transport.get_cookies(),
+                self._get_api_key_header(),
+                headers=dict(self.transport.session.headers),
+                ttl=session_ttl,
+            )
+
+    def restore_session(self, session_path):
+        """
+        Loads a session saved by a previous sign in and checks that Mint still
+        accepts it.  Returns True if the session transport is ready to use.
+        """
+        session = load_session(session_path)
+        if session is None:
+            return False
+
+        self.transport = SessionTransport(
+            cookies=session["cookies"], headers=session["headers"]
+        )
+        self._api_key_header = session["apiKeyHeader"]
+        if self._probe_session():
+            return True
+
+        logger.info("Saved Mint session is no longer valid")
+        self.transport.close()
+        self.transport = None
+        self._api_key_header = None
+        delete_session(session_path)
+        return False
+
+    def _probe_session(self):
+        # A single-record category request is the cheapest authenticated call.
+        endpoint = self.__find_endpoint(constants.CATEGORY_KEY)
+        url = "{}/{}/{}?limit=1".format(
+            constants.MINT_ROOT_URL, endpoint["apiVersion"], endpoint["endpoint"]
+        )
+        import requests
+
+        try:
+            response = self._request(
+                constants.GET_METHOD, url, headers=self._get_api_key_header()
+            )
+        except requests.RequestException:
+            return False
+        return response.status_code == 200
+
+    def wait_for_sync(self, timeout=None):
+        """
+        Waits for the account sync started at sign in with
+        ``sync_in_background`` and returns its status message.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            seconds to wait, by default None (until the sync times out)
+
+        Returns
+        -------
+        Optional[str]
+            the status bar message, or None if the sync did not complete
+        """
+        if self.sync_status is not None:
+            self.status_message = self.sync_status.result(timeout)
+        return self.status_message
+
     def get_attention(self):
+        self.wait_for_sync()
         attention = None
         # noinspection PyBroadException
         try:
@@ -229,56 +507,121 @@ class Mint(object):
         return attention
 
     def get_bills(self):
-        return self.get(
+        return self._authorized_request(
+            constants.GET_METHOD,
             "{}/bps/v2/payer/bills".format(constants.MINT_ROOT_URL),
-            headers=self._get_api_key_header(),
         ).json()["bills"]
 
-    def get_data(self, method, name, payload=None, **kwargs):
+    def get_data(self, method, name, payload=None, model=False, **kwargs):
+        endpoint = self.__find_endpoint(name)
+        cache_key = None
+        data = None
+        if self.response_cache is not None and endpoint["cacheTTL"]:
+            cache_key = ResponseCache.make_key(
+                name,
+                payload.to_dict() if payload is not None else None,
+                login=self.email,
+                **kwargs,
+            )
+            data = self.response_cache.get(cache_key)
+        if data is None:
+            if method == "POST":
+                data = self.__post_mint_endpoint(endpoint, payload)
+            else:
+                data = self.__get_mint_endpoint(endpoint, **kwargs)
+            if cache_key is not None and name in data.keys():
+                self.response_cache.set(cache_key, name, data, endpoint["cacheTTL"])
+        if name not in data.keys():
+            raise self.__missing_key_exception(endpoint, name)
+        records = data[name]
+        for index, record in enumerate(records):
+            record = self.__process_record(endpoint, record)
+            # Replace in place so each dict can be freed as soon as its record
+            # model is built.
+            records[index] = MODELS[name](record) if model else record
+        return records
+
+    def iter_data(self, method, name, payload=None, model=False, **kwargs):
+        """
+        Streaming counterpart of `get_data`.  The response body is decoded
+        incrementally and records are yielded one at a time, so memory stays
+        flat regardless of the page size.  The response cache is not used.
+        """
         endpoint = self.__find_endpoint(name)
         if method == "POST":
-            data = self.__post_mint_endpoint(endpoint, payload)
-        else:
-            data = self.__get_mint_endpoint(endpoint, **kwargs)
-        if name in data.keys():
-            for i in data[name]:
-                if endpoint["includeCreatedDate"]:
-                    i["createdDate"] = i["metaData"]["createdDate"]
-                if endpoint["includeUpdatedDate"]:
-                    i["lastUpdatedDate"] = i["metaData"]["lastUpdatedDate"]
-                i.pop("metaData", None)
+            response = self._authorized_request(
+                constants.POST_METHOD,
+                self.__post_mint_endpoint_url(endpoint),
+                json=payload.to_dict(),
+                stream=True,
+            )
         else:
-            raise MintException(
-                "Data from the {} endpoint did not containt the expected {} key.".format(
-                    endpoint["endpoint"], name
-                )
+            response = self._authorized_request(
+                constants.GET_METHOD,
+                self.__get_mint_endpoint_url(endpoint, **kwargs),
+                stream=True,
             )
-        return data[name]
+        try:
+            records = iter_json_array(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE), name
+            )
+            for i in records:
+                record = self.__process_record(endpoint, i)
+                yield MODELS[name](record) if model else record
+        except KeyError:
+            raise self.__missing_key_exception(endpoint, name)
+        finally:
+            response.close()
+
+    def __process_record(self, endpoint, record):
+        if endpoint["includeCreatedDate"]:
+            record["createdDate"] = record["metaData"]["createdDate"]
+        if endpoint["includeUpdatedDate"]:
+            record["lastUpdatedDate"] = record["metaData"]["lastUpdatedDate"]
+        record.pop("metaData", None)
+        return record
+
+    def __missing_key_exception(self, endpoint, name):
+        return MintException(
+            "Data from the {} endpoint did not containt the expected {} key.".format(
+                endpoint["endpoint"], name
+            )
+        )
 
     def get_account_data(
         self,
         limit=5000,
+        model=False,
     ):
         return self.get_data(
-            method=constants.GET_METHOD, name=constants.ACCOUNT_KEY, limit=limit
+            method=constants.GET_METHOD,
+            name=constants.ACCOUNT_KEY,
+            model=model,
+            limit=limit,
         )
 
     def get_category_data(
         self,
         limit=5000,
+        model=False,
     ):
         return self.get_data(
-            method=constants.GET_METHOD, name=constants.CATEGORY_KEY, limit=limit
+            method=constants.GET_METHOD,
+            name=constants.CATEGORY_KEY,
+            model=model,
+            limit=limit,
         )
 
     def get_budget_data(
         self,
         limit=5000,
+        model=False,
     ):
         return self.get_data(
             method=constants.GET_METHOD,
             name=constants.BUDGET_KEY,
             payload=None,
+            model=model,
             limit=limit,
             id=None,
             start_date=self.__x_months_ago(11),
@@ -288,10 +631,12 @@ class Mint(object):
     def get_investment_data(
         self,
         limit=5000,
+        model=False,
     ):
         return self.get_data(
             method=constants.GET_METHOD,
             name=constants.INVESTMENT_KEY,
+            model=model,
             limit=limit,
         )
 
@@ -309,11 +654,117 @@ class Mint(object):
             ]
         )
 
+    def get_arrow_table(self, name, **kwargs):
+        """
+        Returns accounts, budgets, investments or transactions as an Arrow table
+        with a stable schema (see `mintapi.columnar.SCHEMAS`).  Requires
+        pyarrow.
+
+        Parameters
+        ----------
+        name : str
+            dataset key, one of "Account", "Budget", "Investment" or "Transaction"
+        **kwargs
+            passed to `get_account_data`, `get_budget_data`,
+            `get_investment_data` or `iter_transactions`; transactions are
+            streamed page by page into the table
+
+        Returns
+        -------
+        pyarrow.Table
+            one row per record
+        """
+        fetchers = {
+            constants.ACCOUNT_KEY: self.get_account_data,
+            constants.BUDGET_KEY: self.get_budget_data,
+            constants.INVESTMENT_KEY: self.get_investment_data,
+            constants.TRANSACTION_KEY: functools.partial(
+                self.iter_transactions, stream=True
+            ),
+        }
+        if name not in fetchers:
+            raise ValueError(
+                "name must be one of {}".format(", ".join(sorted(fetchers)))
+            )
+        # Fail before fetching anything if pyarrow is missing.
+        import_pyarrow()
+        return to_arrow_table(name, fetchers[name](**kwargs))
+
+    def get_account_frame(self, limit=5000):
+        """
+        Returns accounts as a pandas DataFrame with typed columns (see
+        `mintapi.frames`).
+        """
+        # pandas is slow to import, so it is only loaded when a frame is asked for.
+        from mintapi.frames import to_frame
+
+        return to_frame(constants.ACCOUNT_KEY, self.get_account_data(limit=limit))
+
+    def get_budget_frame(self, limit=5000):
+        """
+        Returns budgets as a pandas DataFrame with typed columns (see
+        `mintapi.frames`).
+        """
+        from mintapi.frames import to_frame
+
+        return to_frame(constants.BUDGET_KEY, self.get_budget_data(limit=limit))
+
+    def get_investment_frame(self, limit=5000):
+        """
+        Returns investments as a pandas DataFrame with typed columns (see
+        `mintapi.frames`).
+        """
+        from mintapi.frames import to_frame
+
+        return to_frame(constants.INVESTMENT_KEY, self.get_investment_data(limit=limit))
+
+    def get_transaction_frame(
+        self,
+        include_investment: bool = False,
+        remove_pending: bool = True,
+        **kwargs,
+    ):
+        """
+        Returns transactions as a pandas DataFrame with typed columns (see
+        `mintapi.frames`): datetime64 dates, float64 amounts and categorical
+        account, category and type columns.  The pending and investment
+        filters are applied to the frame with vectorized operations.
+
+        Parameters
+        ----------
+        include_investment : bool, optional
+            whether to include transactions of type InvestmentTransaction; by default, this is False
+        remove_pending : bool, optional
+            whether to include transactions that are still Pending; by default, this is True
+        **kwargs
+            any other `get_transaction_data` parameter, e.g. date_filter or shard_by
+
+        Returns
+        -------
+        pandas.DataFrame
+            one row per transaction
+        """
+        from mintapi.frames import filter_transaction_frame, to_frame
+
+        # Unless Mint filters the rows, leave it to the vectorized pass below.
+        server_side_filters = kwargs.get("server_side_filters", False)
+        frame = to_frame(
+            constants.TRANSACTION_KEY,
+            self.get_transaction_data(
+                include_investment=include_investment or not server_side_filters,
+                remove_pending=remove_pending and server_side_filters,
+                **kwargs,
+            ),
+        )
+        return filter_transaction_frame(frame, include_investment, remove_pending)
+
     def initiate_account_refresh(self):
         self.post(
             url="{}/refreshFILogins.xevent".format(constants.MINT_ROOT_URL),
             headers=constants.JSON_HEADER,
         )
+        if self.response_cache is not None:
+            self.response_cache.invalidate()
 
     def get_credit_score_data(self):
         # Request a single credit report, and extract the score
@@ -373,17 +824,31 @@ class Mint(object):
         # Because cookies are involved and you cannot add cookies for another
         # domain, we have to first load up the MINT_CREDIT_URL.  Once the new
         # domain has loaded, we can proceed with the pull of credit data.
-        return self.driver.get(constants.MINT_CREDIT_URL)
+        if self.driver is None:
+            # The driver was closed after copying the session; rely on the
+            # session cookies alone.
+            return None
+        # Leaving the overview page hides the account status bar, so a
+        # background sync watch has to finish first.
+        self.wait_for_sync()
+        with self._driver_lock:
+            result = self.driver.get(constants.MINT_CREDIT_URL)
+            if self.transport is not None:
+                self.transport.update_cookies(self.driver.get_cookies())
+        return result
 
     def _get_credit_reports(self, limit, credit_header):
-        return self.get(
+        return self._authorized_request(
+            constants.GET_METHOD,
             "{}/v1/creditreports?limit={}".format(constants.MINT_CREDIT_URL, limit),
             headers=credit_header,
         ).json()
 
     def _get_credit_details(self, url, credit_header):
-        return self.get(
-            url.format(constants.MINT_CREDIT_URL), headers=credit_header
+        return self._authorized_request(
+            constants.GET_METHOD,
+            url.format(constants.MINT_CREDIT_URL),
+            headers=credit_header,
         ).json()
 
     def get_credit_inquiries(self, credit_header):
@@ -434,7 +899,13 @@ class Mint(object):
     def __find_endpoint(self, name):
         return ENDPOINTS[name]
 
-    def __get_mint_endpoint(
+    def __get_mint_endpoint(self, endpoint, **kwargs):
+        response = self._authorized_request(
+            constants.GET_METHOD, self.__get_mint_endpoint_url(endpoint, **kwargs)
+        )
+        return response.json()
+
+    def __get_mint_endpoint_url(
         self, endpoint, limit=5000, id=None, start_date=None, end_date=None
     ):
         url = "{}/{}/{}?limit={}&".format(
@@ -446,20 +917,20 @@ class Mint(object):
             url = url + "{}={}&".format(endpoint["endingDate"], end_date)
         if id is not None:
             url = url + "id={}&".format(id)
-        response = self.get(
-            url,
-            headers=self._get_api_key_header(),
+        return url
+
+    def __post_mint_endpoint(self, endpoint, payload):
+        response = self._authorized_request(
+            constants.POST_METHOD,
+            self.__post_mint_endpoint_url(endpoint),
+            json=payload.to_dict(),
         )
         return response.json()
 
-    def __post_mint_endpoint(self, endpoint, payload):
-        url = "{}/{}/{}".format(
+    def __post_mint_endpoint_url(self, endpoint):
+        return "{}/{}/{}".format(
             constants.MINT_ROOT_URL, endpoint["apiVersion"], endpoint["endpoint"]
         )
-        response = self.post(
-            url, json=payload.to_dict(), headers=self._get_api_key_header()
-        )
-        return response.json()
 
     def __first_of_this_month(self):
         return date.today().replace(day=1)
@@ -482,6 +953,7 @@ class Mint(object):
         match_all_filters: bool = True,
         limit: int = 5000,
         offset: int = 0,
+        model: bool = False,
     ) -> List[Dict]:
         """
         Public accessor for trend data. Internally constructs a trend api payload
@@ -511,6 +983,9 @@ class Mint(object):
             page size, by default 5000
         offset : int, optional
             offset pagination for next pages, by default 0
+        model : bool, optional
+            return compact `Record` models (read-only mappings with the same
+            keys) instead of dicts, by default False
 
         Returns
         -------
@@ -531,7 +1006,9 @@ class Mint(object):
             offset=offset,
             search_clauses=search_clauses,
         )
-        data = self.get_data(constants.POST_METHOD, constants.TRENDS_KEY, payload)
+        data = self.get_data(
+            constants.POST_METHOD, constants.TRENDS_KEY, payload, model=model
+        )
         return data
 
     def get_transaction_data(
@@ -548,6 +1025,10 @@ class Mint(object):
         remove_pending: bool = True,
         limit: int = 5000,
         offset: int = 0,
+        shard_by: Optional[str] = None,
+        max_workers: int = 4,
+        model: bool = False,
+        server_side_filters: bool = False,
     ) -> List[Dict]:
         """
         Public accessor for transaction data. Internally constructs a transaction/search api payload
@@ -579,12 +1060,44 @@ class Mint(object):
             page size, by default 5000
         offset : int, optional
             offset pagination for next pages, by default 0
+        shard_by : Optional[str], optional
+            with the CUSTOM date filter, split the date range into "month" or
+            "quarter" windows that are fetched concurrently (every page of each
+            window is fetched, so offset is ignored), by default None
+        max_workers : int, optional
+            maximum number of windows fetched at once when sharding, by default 4
+        model : bool, optional
+            return compact `Record` models (read-only mappings with the same
+            keys) instead of dicts, by default False
+        server_side_filters : bool, optional
+            also send the pending and investment exclusions to Mint as search
+            filters, so those rows are not downloaded; the results are still
+            filtered locally, by default False
 
         Returns
         -------
         List[Dict]
             returns a list of transaction results (each dict)
         """
+        if shard_by is not None:
+            return self.__get_sharded_transaction_data(
+                shard_by=shard_by,
+                max_workers=max_workers,
+                date_filter=date_filter,
+                start_date=start_date,
+                end_date=end_date,
+                category_ids=category_ids,
+                tag_ids=tag_ids,
+                descriptions=descriptions,
+                account_ids=account_ids,
+                match_all_filters=match_all_filters,
+                include_investment=include_investment,
+                remove_pending=remove_pending,
+                page_size=limit,
+                model=model,
+                server_side_filters=server_side_filters,
+            )
+
         search_clauses = self.__build_search_clauses(
             category_ids, tag_ids, descriptions, account_ids
         )
@@ -599,20 +1112,337 @@ class Mint(object):
             limit=limit,
             offset=offset,
             search_clauses=search_clauses,
+            exclusion_clauses=self.__build_exclusion_clauses(
+                include_investment, remove_pending, server_side_filters
+            ),
+        )
+        data = self.get_data(
+            constants.POST_METHOD, constants.TRANSACTION_KEY, payload, model=model
         )
-        data = self.get_data(constants.POST_METHOD, constants.TRANSACTION_KEY, payload)
+        return list(
+            self.__filter_transactions(data, include_investment, remove_pending)
+        )
+
+    def __get_sharded_transaction_data(
+        self, shard_by, max_workers, date_filter, start_date, end_date, **kwargs
+    ):
+        if shard_by not in SHARD_MONTHS:
+            raise ValueError(
+                "shard_by must be one of {}".format(", ".join(SHARD_MONTHS))
+            )
+        if date_filter != DateFilter.Options.CUSTOM:
+            raise ValueError("shard_by requires the CUSTOM date filter")
+        windows = split_date_range(
+            convert_mmddyy_to_datetime(start_date),
+            convert_mmddyy_to_datetime(end_date),
+            SHARD_MONTHS[shard_by],
+        )
+
+        def fetch_window(window):
+            window_start, window_end = window
+            return list(
+                self.iter_transactions(
+                    date_filter=DateFilter.Options.CUSTOM,
+                    start_date=window_start.strftime("%m/%d/%y"),
+                    end_date=window_end.strftime("%m/%d/%y"),
+                    **kwargs,
+                )
+            )
+
+        if self.supports_concurrent_requests and max_workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="mintapi"
+            ) as executor:
+                pages = list(executor.map(fetch_window, windows))
+        else:
+            pages = [fetch_window(window) for window in windows]
+
+        # Windows do not overlap, but a transaction whose date is edited while
+        # the backfill runs can still show up in two of them.
+        transactions = {}
+        for page in pages:
+            for transaction in page:
+                transactions[transaction["id"]] = transaction
+        return sorted(
+            transactions.values(),
+            key=lambda transaction: transaction["date"],
+            reverse=True,
+        )
+
+    def sync_transactions(
+        self,
+        store,
+        lookback_days: int = 30,
+        include_investment: bool = False,
+        remove_pending: bool = True,
+        page_size: int = 1000,
+    ) -> Dict[str, int]:
+        """
+        Incrementally syncs transactions into a local store.  The first run
+        downloads the full history; later runs only fetch the trailing window
+        starting `lookback_days` before the highest `lastUpdatedDate` seen so
+        far, and merge new and updated transactions into the store.  Stored
+        transactions dated within the fetched range that Mint no longer returns
+        are deleted.
+
+        The window is selected by transaction date, as Mint cannot search by
+        modification time: a transaction dated before the window that is
+        edited later is only refreshed by a larger `lookback_days` or a full
+        resync into an empty store.
+
+        Parameters
+        ----------
+        store : TransactionStore
+            store holding the high-water mark and previously synced transactions
+        lookback_days : int, optional
+            number of days before the high-water mark to re-fetch, by default 30
+        include_investment : bool, optional
+            whether to include transactions of type InvestmentTransaction; by default, this is False
+        remove_pending : bool, optional
+            whether to include transactions that are still Pending; by default, this is True
+        page_size : int, optional
+            number of transactions requested per page, by default 1000
+
+        Returns
+        -------
+        Dict[str, int]
+            number of transactions "inserted", "updated" and "deleted" in the
+            store
+        """
+        high_water_mark = store.get_high_water_mark()
+        if high_water_mark is None:
+            date_filter = DateFilter.Options.ALL_TIME
+            start_date = end_date = None
+            window_ids = store.get_transaction_ids()
+        else:
+            date_filter = DateFilter.Options.CUSTOM
+            window_start = datetime.strptime(
+                high_water_mark[:10], "%Y-%m-%d"
+            ) - relativedelta(days=lookback_days)
+            window_end = date.today()
+            start_date = window_start.strftime("%m/%d/%y")
+            end_date = window_end.strftime("%m/%d/%y")
+            window_ids = store.get_transaction_ids(
+                window_start.strftime("%Y-%m-%d"), window_end.isoformat()
+            )
+
+        known_ids = store.get_transaction_ids()
+        inserted = []
+        updated = []
+        returned_ids = set()
+        new_high_water_mark = high_water_mark
+        # The window is fetched unfiltered so that transactions missing from
+        # it can be told apart from ones the filters leave out.
+        for transaction in self.iter_transactions(
+            date_filter=date_filter,
+            start_date=start_date,
+            end_date=end_date,
+            include_investment=True,
+            remove_pending=False,
+            page_size=page_size,
+        ):
+            returned_ids.add(transaction["id"])
+            if (remove_pending and transaction["isPending"] != False) or (
+                not include_investment
+                and transaction["type"] == INVESTMENT_TRANSACTION_TYPE
+            ):
+                continue
+            # lastUpdatedDate is an ISO 8601 UTC timestamp, so strings compare
+            # in chronological order.
+            last_updated = transaction.get("lastUpdatedDate")
+            if transaction["id"] not in known_ids:
+                inserted.append(transaction)
+            elif last_updated is not None and (
+                high_water_mark is None or last_updated > high_water_mark
+            ):
+                updated.append(transaction)
+            if last_updated is not None and (
+                new_high_water_mark is None or last_updated > new_high_water_mark
+            ):
+                new_high_water_mark = last_updated
+
+        deleted = window_ids - returned_ids
+        store.upsert_transactions(inserted + updated)
+        if deleted:
+            store.delete_transactions(deleted)
+        if new_high_water_mark != high_water_mark:
+            store.set_high_water_mark(new_high_water_mark)
+        return {
+            "inserted": len(inserted),
+            "updated": len(updated),
+            "deleted": len(deleted),
+        }
+
+    def iter_transactions(
+        self,
+        date_filter: DateFilter.Options = DateFilter.Options.ALL_TIME,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        category_ids: List[str] = None,
+        tag_ids: List[str] = None,
+        descriptions: List[str] = None,
+        account_ids: List[str] = None,
+        match_all_filters: bool = True,
+        include_investment: bool = False,
+        remove_pending: bool = True,
+        page_size: int = 1000,
+        max_records: Optional[int] = None,
+        offset: int = 0,
+        stream: bool = False,
+        model: bool = False,
+        server_side_filters: bool = False,
+    ) -> Iterator[Dict]:
+        """
+        Generator over all transactions matching the filters.  Pages of
+        `page_size` are requested, walking the offset until the data runs out.
+
+        Parameters are the same as `get_transaction_data`, except:
+
+        page_size : int, optional
+            number of transactions requested per page, by default 1000
+        max_records : Optional[int], optional
+            stop after yielding this many transactions, by default None (no cap)
+        offset : int, optional
+            offset of the first page, by default 0
+        stream : bool, optional
+            decode each page incrementally from the response stream instead of
+            loading it whole, by default False
+        model : bool, optional
+            return compact `Record` models (read-only mappings with the same
+            keys) instead of dicts, by default False
+
+        Returns
+        -------
+        Iterator[Dict]
+            yields transaction results (each dict), page by page
+        """
+        search_clauses = self.__build_search_clauses(
+            category_ids, tag_ids, descriptions, account_ids
+        )
+        pages = self.__iter_pages(
+            request=TransactionRequest,
+            name=constants.TRANSACTION_KEY,
+            report_type=None,
+            date_filter=date_filter,
+            start_date=start_date,
+            end_date=end_date,
+            match_all_filters=match_all_filters,
+            page_size=page_size,
+            offset=offset,
+            stream=stream,
+            model=model,
+            search_clauses=search_clauses,
+            exclusion_clauses=self.__build_exclusion_clauses(
+                include_investment, remove_pending, server_side_filters
+            ),
+        )
+        pages = (
+            self.__filter_transactions(page, include_investment, remove_pending)
+            for page in pages
+        )
+        return self.__iter_records(pages, max_records)
+
+    def iter_trends(
+        self,
+        report_type: ReportView.Options = ReportView.Options.SPENDING_TIME,
+        date_filter: DateFilter.Options = DateFilter.Options.THIS_MONTH,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        category_ids: List[str] = None,
+        tag_ids: List[str] = None,
+        descriptions: List[str] = None,
+        account_ids: List[str] = None,
+        match_all_filters: bool = True,
+        page_size: int = 1000,
+        max_records: Optional[int] = None,
+        offset: int = 0,
+        stream: bool = False,
+        model: bool = False,
+    ) -> Iterator[Dict]:
+        """
+        Generator over all trend results matching the filters.  Pages of
+        `page_size` are requested, walking the offset until the data runs out.
+
+        Parameters are the same as `get_trend_data`, except:
+
+        page_size : int, optional
+            number of trend results requested per page, by default 1000
+        max_records : Optional[int], optional
+            stop after yielding this many trend results, by default None (no cap)
+        offset : int, optional
+            offset of the first page, by default 0
+        stream : bool, optional
+            decode each page incrementally from the response stream instead of
+            loading it whole, by default False
+        model : bool, optional
+            return compact `Record` models (read-only mappings with the same
+            keys) instead of dicts, by default False
+
+        Returns
+        -------
+        Iterator[Dict]
+            yields trend results (each dict), page by page
+        """
+        search_clauses = self.__build_search_clauses(
+            category_ids, tag_ids, descriptions, account_ids
+        )
+        pages = self.__iter_pages(
+            request=TrendRequest,
+            name=constants.TRENDS_KEY,
+            report_type=report_type,
+            date_filter=date_filter,
+            start_date=start_date,
+            end_date=end_date,
+            match_all_filters=match_all_filters,
+            page_size=page_size,
+            offset=offset,
+            stream=stream,
+            model=model,
+            search_clauses=search_clauses,
+        )
+        return self.__iter_records(pages, max_records)
+
+    def __iter_pages(
+        self, name, page_size, offset, stream=False, model=False, **kwargs
+    ):
+        while True:
+            payload = self.__build_payload(limit=page_size, offset=offset, **kwargs)
+            if stream:
+                page = self.iter_data(constants.POST_METHOD, name, payload, model)
+            else:
+                page = self.get_data(constants.POST_METHOD, name, payload, model)
+            # Pages are consumed fully before the next one is requested, so the
+            # count is complete by the time it is checked.
+            counter = _RecordCounter(page)
+            yield counter
+            if counter.count < page_size:
+                return
+            offset += counter.count
+
+    def __iter_records(self, pages, max_records):
+        if max_records is not None and max_records <= 0:
+            return
+        count = 0
+        for page in pages:
+            for record in page:
+                yield record
+                count += 1
+                # Stop before requesting another page once the cap is reached.
+                if max_records is not None and count >= max_records:
+                    return
+
+    def __filter_transactions(self, data, include_investment, remove_pending):
+        # Filters are applied lazily so that streamed pages stay streamed.
         if remove_pending:
-            filtered = filter(
+            data = filter(
                 lambda transaction: transaction["isPending"] == False,
                 data,
             )
-            data = list(filtered)
         if not include_investment:
-            filtered = filter(
-                lambda transaction: transaction["type"] != "InvestmentTransaction",
+            data = filter(
+                lambda transaction: transaction["type"] != INVESTMENT_TRANSACTION_TYPE,
                 data,
             )
-            data = list(filtered)
         return data
 
     def __build_search_clauses(self, category_ids, tag_ids, descriptions, account_ids):
@@ -620,7 +1450,10 @@ class Mint(object):
         include_child_categories = True
         if category_ids:
             search_clauses = self.__append_filter(
-                CategoryIdFilter, search_clauses, tag_ids, include_child_categories
+                CategoryIdFilter,
+                search_clauses,
+                category_ids,
+                include_child_categories=include_child_categories,
             )
         if tag_ids:
             search_clauses = self.__append_filter(TagIdFilter, search_clauses, tag_ids)
@@ -634,6 +1467,22 @@ class Mint(object):
             )
         return search_clauses
 
+    def __build_exclusion_clauses(
+        self, include_investment, remove_pending, server_side_filters
+    ):
+        if not server_side_filters:
+            return []
+        exclusion_clauses = []
+        if remove_pending:
+            exclusion_clauses.append(
+                TransactionStatusFilter(value=PENDING_STATUS, exclude=True)
+            )
+        if not include_investment:
+            exclusion_clauses.append(
+                TransactionTypeFilter(value=INVESTMENT_TRANSACTION_TYPE, exclude=True)
+            )
+        return exclusion_clauses
+
     def __build_payload(
         self,
         request,
@@ -645,6 +1494,7 @@ class Mint(object):
         limit,
         offset,
         search_clauses,
+        exclusion_clauses=(),
     ):
         return request(
             date_filter=DateFilter(
@@ -653,7 +1503,9 @@ class Mint(object):
                 end_date=convert_mmddyy_to_datetime(end_date),
             ),
             search_filters=SearchFilter(
-                match_all_filters=search_clauses if match_all_filters else [],
+                # Exclusions must hold for every result, whatever the mode.
+                match_all_filters=(search_clauses if match_all_filters else [])
+                + list(exclusion_clauses),
                 match_any_filters=search_clauses if not match_all_filters else [],
             ),
             report_view=ReportView(report_type=report_type)
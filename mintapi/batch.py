@@ -0,0 +1,220 @@
+"""
+Batch runner
+
+Signs in to many Mint logins and fetches their data through a bounded pool of
+browsers.  Each profile from the profiles file is queued and handled by one of
+``max_browsers`` workers, so at most that many Chrome instances run at once.
+Chrome has no hard memory cap, so ``memory_limit_mb`` bounds the JavaScript
+heap and keeps each browser to a single renderer process instead.  Every login
+gets its own result, holding either its data or the error that stopped it.
+
+A profiles file is a JSON list of objects (or ``{"profiles": [...]}``).  Each
+object holds the keyword arguments of ``Mint`` (``email``, ``password``,
+``mfa_method``, ...) plus an optional ``name`` and ``datasets``::
+
+    [{"name": "alice", "email": "alice@example.com", "password": "...",
+      "datasets": ["accounts", "transactions"]}]
+"""
+
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import configargparse
+
+from mintapi import constants
+from mintapi.api import Mint
+
+logger = logging.getLogger("mintapi")
+
+DEFAULT_MAX_BROWSERS = 2
+DEFAULT_DATASETS = ("accounts",)
+
+# Dataset name in a profile -> (output key, fetch)
+DATASETS = {
+    "accounts": (constants.ACCOUNT_KEY, lambda mint: mint.get_account_data()),
+    "bills": (constants.BILL_KEY, lambda mint: mint.get_bills()),
+    "budgets": (constants.BUDGET_KEY, lambda mint: mint.get_budget_data()),
+    "categories": (constants.CATEGORY_KEY, lambda mint: mint.get_category_data()),
+    "credit_report": (
+        constants.CREDIT_REPORT_KEY,
+        lambda mint: mint.get_credit_report_data(),
+    ),
+    "credit_score": (
+        constants.CREDIT_SCORE_KEY,
+        lambda mint: mint.get_credit_score_data(),
+    ),
+    "investments": (
+        constants.INVESTMENT_KEY,
+        lambda mint: mint.get_investment_data(),
+    ),
+    "net_worth": (constants.NET_WORTH_KEY, lambda mint: mint.get_net_worth_data()),
+    "transactions": (
+        constants.TRANSACTION_KEY,
+        lambda mint: mint.get_transaction_data(),
+    ),
+    "trends": (constants.TRENDS_KEY, lambda mint: mint.get_trend_data()),
+}
+
+
+def memory_limit_chrome_arguments(memory_limit_mb):
+    """Chrome arguments that keep a browser's memory use to about ``memory_limit_mb``."""
+    return [
+        "js-flags=--max-old-space-size={}".format(memory_limit_mb),
+        "renderer-process-limit=1",
+        "disable-extensions",
+        "disable-dev-shm-usage",
+        "disk-cache-size=1",
+    ]
+
+
+@dataclass
+class BatchResult:
+    """The data fetched for one profile, or the error that stopped it."""
+
+    name: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {"data": self.data, "error": self.error}
+
+
+def load_profiles(path):
+    with open(path) as f:
+        profiles = json.load(f)
+    if isinstance(profiles, dict):
+        profiles = profiles["profiles"]
+    names = set()
+    for index, profile in enumerate(profiles):
+        profile.setdefault("name", profile.get("email") or str(index))
+        if profile["name"] in names:
+            raise ValueError("Duplicate profile name: {}".format(profile["name"]))
+        names.add(profile["name"])
+        unknown = set(profile.get("datasets", ())) - set(DATASETS)
+        if unknown:
+            raise ValueError(
+                "Unknown datasets for {}: {}".format(
+                    profile["name"], ", ".join(sorted(unknown))
+                )
+            )
+    return profiles
+
+
+def run_profile(profile, mint_factory, chrome_arguments=()):
+    profile = dict(profile)
+    result = BatchResult(profile.pop("name"))
+    datasets = profile.pop("datasets", DEFAULT_DATASETS)
+    profile.setdefault("headless", True)
+    profile["chrome_arguments"] = list(profile.get("chrome_arguments") or ()) + list(
+        chrome_arguments
+    )
+    mint = None
+    try:
+        mint = mint_factory(**profile)
+        for dataset in datasets:
+            key, fetch = DATASETS[dataset]
+            result.data[key] = fetch(mint)
+    except Exception as e:
+        logger.exception(e)
+        result.error = "{}: {}".format(type(e).__name__, e)
+    finally:
+        if mint is not None:
+            mint.close()
+    return result
+
+
+def run_batch(
+    profiles,
+    max_browsers=DEFAULT_MAX_BROWSERS,
+    memory_limit_mb=None,
+    mint_factory=Mint,
+):
+    """
+    Signs in to each profile and fetches its datasets, with at most
+    ``max_browsers`` browsers running at once.
+
+    Parameters
+    ----------
+    profiles : List[Dict]
+        ``Mint`` keyword arguments plus ``name`` and ``datasets``, see the
+        module docstring
+    max_browsers : int, optional
+        number of profiles handled at once, by default 2
+    memory_limit_mb : Optional[int], optional
+        approximate memory limit of each browser, by default None
+    mint_factory : Callable[..., Mint], optional
+        builds a signed in ``Mint`` from a profile, by default ``Mint``
+
+    Returns
+    -------
+    List[BatchResult]
+        one result per profile, in the order of ``profiles``
+    """
+    chrome_arguments = (
+        memory_limit_chrome_arguments(memory_limit_mb) if memory_limit_mb else ()
+    )
+    with ThreadPoolExecutor(
+        max_workers=max_browsers, thread_name_prefix="mintapi-batch"
+    ) as executor:
+        futures = {
+            executor.submit(run_profile, profile, mint_factory, chrome_arguments): index
+            for index, profile in enumerate(profiles)
+        }
+        results = [None] * len(profiles)
+        for future in as_completed(futures):
+            result = future.result()
+            if result.ok:
+                logger.info("Fetched data for {}".format(result.name))
+            else:
+                logger.error("Failed to fetch {}: {}".format(result.name, result.error))
+            results[futures[future]] = result
+    return results
+
+
+def parse_arguments(args):
+    cmdline = configargparse.ArgumentParser(prog="mintapi batch")
+    cmdline.add_argument("profiles", help="JSON file with the login profiles")
+    cmdline.add_argument(
+        "--filename",
+        "-f",
+        default=None,
+        help="Write the results to FILENAME.json instead of stdout",
+    )
+    cmdline.add_argument(
+        "--max-browsers",
+        type=int,
+        default=DEFAULT_MAX_BROWSERS,
+        help="Number of browsers run at once.  Default is 2",
+    )
+    cmdline.add_argument(
+        "--memory-limit",
+        type=int,
+        default=None,
+        help="Approximate memory limit of each browser, in MB",
+    )
+    return cmdline.parse_args(args)
+
+
+def main(args):
+    options = parse_arguments(args)
+    results = run_batch(
+        load_profiles(options.profiles),
+        max_browsers=options.max_browsers,
+        memory_limit_mb=options.memory_limit,
+    )
+    output = {result.name: result.to_dict() for result in results}
+    if options.filename is None:
+        print(json.dumps(output, indent=2))
+    else:
+        with open("{}.json".format(options.filename), "w+") as f:
+            json.dump(output, f, indent=2)
+    if not all(result.ok for result in results):
+        sys.exit(1)
@@ -0,0 +1,156 @@
+"""
+Response cache helper classes
+
+``Mint.get_data`` consults a ``ResponseCache`` before calling an endpoint whose
+``cacheTTL`` in ``ENDPOINTS`` is set.  Responses are kept as serialized JSON so
+that every hit decodes a fresh copy the caller is free to mutate.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("mintapi")
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of endpoint responses, optionally backed by a directory
+    so that entries survive between runs.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        maximum number of responses kept in memory and on disk, by default 128
+    cache_dir : Optional[str], optional
+        directory for the on-disk cache, by default None (memory only)
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+
+    @staticmethod
+    def make_key(name, payload=None, login=None, **kwargs):
+        """
+        Builds a cache key from the signed in login (e.g. its email), the
+        endpoint name, query parameters and payload, so that logins sharing a
+        cache never see each other's responses.
+        """
+        key = json.dumps(
+            {
+                "login": login.lower() if login else None,
+                "name": name,
+                "payload": payload,
+                "params": kwargs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        """Returns the cached response, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._read(key)
+                if entry is not None:
+                    self._store(key, entry)
+            if entry is None:
+                return None
+            if entry["expires"] < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return json.loads(entry["body"])
+
+    def set(self, key, name, value, ttl):
+        entry = {"name": name, "expires": time.time() + ttl, "body": json.dumps(value)}
+        with self._lock:
+            self._store(key, entry)
+            self._write(key, entry)
+
+    def invalidate(self, name=None):
+        """Drops every cached response, or only those of the named endpoint."""
+        with self._lock:
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if name is None or entry["name"] == name
+            ]:
+                self._remove(key)
+            for key in self._disk_keys():
+                entry = self._read(key)
+                if name is None or entry is None or entry["name"] == name:
+                    self._remove(key)
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._delete_file(evicted)
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        self._delete_file(key)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _disk_keys(self):
+        if self.cache_dir is None:
+            return []
+        return [
+            filename[: -len(".json")]
+            for filename in os.listdir(self.cache_dir)
+            if filename.endswith(".json")
+        ]
+
+    def _read(self, key):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key, entry):
+        if self.cache_dir is None:
+            return
+        try:
+            # Entries hold balances and holdings, so only the current user
+            # may read them.
+            fd = os.open(self._path(key), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+        except OSError as e:
+            logger.warning("Unable to write response cache entry: {}".format(e))
+            return
+        # Keep the directory within the same bound as memory, dropping the
+        # least recently written entries left over from earlier runs.
+        keys = self._disk_keys()
+        if len(keys) > self.max_entries:
+            keys.sort(key=lambda key: os.path.getmtime(self._path(key)))
+            for key in keys[: len(keys) - self.max_entries]:
+                self._delete_file(key)
+
+    def _delete_file(self, key):
+        if self.cache_dir is None:
+            return
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
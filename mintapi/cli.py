@@ -1,20 +1,54 @@
 import atexit
+import csv
+import itertools
 import logging
 import os
+import queue
 import sys
+import threading
 import json
 import getpass
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Tuple
 from mintapi import constants
-import keyring
 import configargparse
 from mintapi.trends import ReportView
 from mintapi.filters import DateFilter
 from mintapi.api import Mint
-from mintapi.signIn import get_email_code
-from pandas import json_normalize
+from mintapi.cache import ResponseCache
+from mintapi.daemon import DEFAULT_HOST as DEFAULT_DAEMON_HOST
+from mintapi.daemon import DEFAULT_PORT as DEFAULT_DAEMON_PORT
+from mintapi.daemon import DEFAULT_TOKEN_FILE as DEFAULT_DAEMON_TOKEN_FILE
+from mintapi.daemon import DaemonClient, serve
+from mintapi.columnar import (
+    COLUMNAR_FORMATS,
+    PARTITION_COLUMNS,
+    SCHEMAS,
+    to_arrow_table,
+    write_table,
+)
+from mintapi.session import DEFAULT_SESSION_TTL
+from mintapi.store import SQLITE_TABLES, SQLiteStore
 
 logger = logging.getLogger("mintapi")
 
+# Records used to infer the CSV columns, and rows written per chunk
+CSV_SAMPLE_SIZE = 1000
+CSV_CHUNK_SIZE = 1000
+
+# Page size used when streaming transactions and trends
+STREAM_PAGE_SIZE = 1000
+# Records a concurrent fetch may page ahead of the writer
+STREAM_QUEUE_SIZE = STREAM_PAGE_SIZE
+# Seconds between checks for an abandoned plan while a stream queue is full
+STREAM_QUEUE_POLL = 0.1
+
+# Formats written record by record as the data arrives
+STREAMING_FORMATS = (constants.CSV_FORMAT, constants.NDJSON_FORMAT)
+
 
 def parse_arguments(args):
     ARGUMENTS = [
@@ -85,6 +119,13 @@ def parse_arguments(args):
                 "help": "Retrieve 12-month budget history information",
             },
         ),
+        (
+            ("--cache-dir",),
+            {
+                "default": None,
+                "help": "Directory for caching account, budget, category and investment responses between runs.",
+            },
+        ),
         (
             ("--categories",),
             {
@@ -100,6 +141,14 @@ def parse_arguments(args):
                 "help": "The directory to download chromedrive to.",
             },
         ),
+        (
+            ("--chromedriver-version-ttl",),
+            {
+                "type": int,
+                "default": None,
+                "help": "Number of seconds a downloaded chromedriver is used before checking for a newer release.  Use 0 to check on every run.  Default is 24 hours.",
+            },
+        ),
         (
             ("--config-file", "-c"),
             {
@@ -126,6 +175,50 @@ def parse_arguments(args):
                 "help": "Retrieve current credit score",
             },
         ),
+        (
+            ("--daemon-host",),
+            {
+                "default": DEFAULT_DAEMON_HOST,
+                "help": "Address `mintapi daemon` listens on.  Default is 127.0.0.1",
+            },
+        ),
+        (
+            ("--daemon-port",),
+            {
+                "type": int,
+                "default": DEFAULT_DAEMON_PORT,
+                "help": "Port `mintapi daemon` listens on.  Default is 8765",
+            },
+        ),
+        (
+            ("--daemon-token",),
+            {
+                "default": None,
+                "env_var": "MINTAPI_DAEMON_TOKEN",
+                "help": "Token clients must send to `mintapi daemon`.  The daemon generates one when not given.",
+            },
+        ),
+        (
+            ("--daemon-token-file",),
+            {
+                "default": DEFAULT_DAEMON_TOKEN_FILE,
+                "help": "File `mintapi daemon` saves its token to, readable by the current user only, and clients read it from.  Defaults to $HOME/.mintapi/daemon-token",
+            },
+        ),
+        (
+            ("--daemon-url",),
+            {
+                "default": None,
+                "help": "Fetch data through a running `mintapi daemon` at this URL (e.g. http://127.0.0.1:8765) instead of signing in",
+            },
+        ),
+        (
+            ("--database",),
+            {
+                "default": None,
+                "help": "Write accounts, bills, budgets, categories, investments and transactions to this SQLite database instead of JSON/CSV output.",
+            },
+        ),
         (
             ("--end-date",),
             {
@@ -169,15 +262,21 @@ def parse_arguments(args):
         (
             ("--filename", "-f"),
             {
-                "help": "write results to file. can be {csv,json} format. default is to write to stdout."
+                "help": "write results to file. can be {csv,json,ndjson,parquet,arrow} format. default is to write to stdout.  Required for parquet and arrow."
             },
         ),
         (
             ("--format",),
             {
-                "choices": [constants.JSON_FORMAT, constants.CSV_FORMAT],
+                "choices": [
+                    constants.JSON_FORMAT,
+                    constants.NDJSON_FORMAT,
+                    constants.CSV_FORMAT,
+                    constants.PARQUET_FORMAT,
+                    constants.ARROW_FORMAT,
+                ],
                 "default": constants.JSON_FORMAT,
-                "help": "The format used to return data.",
+                "help": "The format used to return data.  ndjson writes one compact JSON object per line as records arrive.  parquet and arrow (which require pyarrow) apply to accounts, budgets, investments and transactions; other data is written as json.",
             },
         ),
         (
@@ -193,7 +292,10 @@ def parse_arguments(args):
         (("--imap-server",), {"default": None, "help": "IMAP server"}),
         (
             ("--imap-test",),
-            {"action": "store_true", "help": "Test imap login and retrieval."},
+            {
+                "action": "store_true",
+                "help": "Test imap login and retrieval: prints the latest Mint code received in the past week, without waiting for a new one.",
+            },
         ),
         (
             ("--intuit-account",),
@@ -233,6 +335,14 @@ def parse_arguments(args):
                 "help": "Number of records to include from the API.  Default is 5000.",
             },
         ),
+        (
+            ("--max-workers",),
+            {
+                "type": int,
+                "default": 4,
+                "help": "Maximum number of datasets fetched concurrently.  Only used with --session-transport or --reuse-session, as the browser is not thread safe.  Default is 4.",
+            },
+        ),
         (
             ("--mfa-method",),
             {
@@ -266,6 +376,14 @@ def parse_arguments(args):
                 "help": "By default, mint api will wait for accounts to sync with the backing financial institutions. If this flag is present, do not wait for them to sync.",
             },
         ),
+        (
+            ("--partition-by-month",),
+            {
+                "action": "store_true",
+                "default": False,
+                "help": "With --format parquet or arrow, write budgets and transactions as a directory with one month=YYYY-MM partition per month.",
+            },
+        ),
         (
             ("--session-path",),
             {
@@ -274,6 +392,38 @@ def parse_arguments(args):
                 "help": "Directory to save browser session, including cookies. Used to prevent repeated MFA prompts. Defaults to $HOME/.mintapi/session.  Set to None to use a temporary profile.",
             },
         ),
+        (
+            ("--reuse-session",),
+            {
+                "action": "store_true",
+                "default": False,
+                "help": "Save the signed in session under --session-path and reuse it on later runs, skipping the browser while it is still valid.  Runs fetching credit data always sign in with the browser.",
+            },
+        ),
+        (
+            ("--session-ttl",),
+            {
+                "type": int,
+                "default": DEFAULT_SESSION_TTL,
+                "help": "Number of seconds a saved session is reused for.  Used with --reuse-session.  Default is 12 hours.",
+            },
+        ),
+        (
+            ("--session-transport",),
+            {
+                "action": "store_true",
+                "default": False,
+                "help": "After signing in, send API requests through a pooled HTTP session instead of the browser, and close the browser early when it is no longer needed.",
+            },
+        ),
+        (
+            ("--shard-by",),
+            {
+                "choices": ["month", "quarter"],
+                "default": None,
+                "help": "Split a custom --start-date/--end-date transaction search into month or quarter windows fetched concurrently.  Used with --transactions.",
+            },
+        ),
         # Displayed to the user as a postive switch, but processed back here as a negative
         (
             ("--show-pending",),
@@ -291,6 +441,14 @@ def parse_arguments(args):
                 "help": "Earliest date for transactions to be retrieved from. Used with --transactions. Format: mm/dd/yy",
             },
         ),
+        (
+            ("--sync-in-background",),
+            {
+                "action": "store_true",
+                "default": False,
+                "help": "Do not wait for the account sync at login; fetch budgets and categories while it runs.",
+            },
+        ),
         (
             ("--transaction-date-filter",),
             {
@@ -354,10 +512,17 @@ def parse_arguments(args):
     for argument_commands, argument_options in ARGUMENTS:
         cmdline.add_argument(*argument_commands, **argument_options)
 
-    return cmdline.parse_args(args)
+    options = cmdline.parse_args(args)
+    if options.format in COLUMNAR_FORMATS and options.filename is None:
+        cmdline.error("--format {} requires --filename".format(options.format))
+    return options
 
 
 def handle_password(type, prompt, email, password, use_keyring=False):
+    if use_keyring:
+        # keyring probes the OS backends on import, so only load it when asked.
+        import keyring
+
     if use_keyring and not password:
         # If we don't yet have a password, try prompting for it
         password = keyring.get_password(type, email)
@@ -381,47 +546,422 @@ def format_filename(options, type):
     return filename
 
 
-def output_data(options, data, type, attention_msg=None):
+def flatten_record(record, prefix=""):
+    """Flattens nested objects into dotted keys, like pandas.json_normalize."""
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, Mapping):
+            flat.update(flatten_record(value, "{}{}.".format(prefix, key)))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def write_csv(data, f, type=None, sample_size=CSV_SAMPLE_SIZE):
+    """
+    Writes records as CSV without materialising the whole dataset.  The
+    columns are the known schema of the dataset, if any, followed by every
+    other key seen in the first ``sample_size`` records; keys that only show up
+    later are dropped.  Rows are then written in chunks as they arrive.
+    """
+    if isinstance(data, Mapping):
+        data = [data]
+    rows = (flatten_record(record) for record in data)
+    sample = list(itertools.islice(rows, sample_size))
+    fieldnames = [column for column, _ in SCHEMAS.get(type, [])]
+    for row in sample:
+        fieldnames.extend(key for key in row if key not in fieldnames)
+    writer = csv.DictWriter(f, fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(sample)
+    columns = set(fieldnames)
+    dropped = set()
+    for chunk in iter(lambda: list(itertools.islice(rows, CSV_CHUNK_SIZE)), []):
+        for row in chunk:
+            dropped.update(key for key in row if key not in columns)
+        writer.writerows(chunk)
+    if dropped:
+        logger.warning(
+            "Columns not seen in the first {} records were left out of the CSV "
+            "output: {}".format(sample_size, ", ".join(sorted(dropped)))
+        )
+
+
+def write_ndjson(data, f):
+    """
+    Writes one compact JSON object per line, flushing after every record so
+    that consumers can tail the output while the fetch is still running.  A
+    single object (such as net worth) is written as one line.
+    """
+    if isinstance(data, Mapping):
+        data = [data]
+    for record in data:
+        f.write(json.dumps(record, separators=(",", ":")))
+        f.write("\n")
+        f.flush()
+
+
+def output_attention(options, attention_msg):
+    if attention_msg is None or attention_msg == "":
+        attention_msg = "no messages"
+    if options.filename is None:
+        print(attention_msg)
+    else:
+        with open(options.filename, "w+") as f:
+            f.write(attention_msg)
+
+
+def output_data(options, data, type):
+    if type == constants.ATTENTION_KEY:
+        output_attention(options, data)
+        return
     filename = format_filename(options, type)
+    if options.format not in STREAMING_FORMATS and isinstance(data, Iterator):
+        # Streamed transactions and trends are only consumed lazily by the
+        # CSV, NDJSON and columnar writers.
+        if options.format not in COLUMNAR_FORMATS or type not in SCHEMAS:
+            data = list(data)
     if filename is None:
         if options.format == constants.CSV_FORMAT:
-            print(json_normalize(data).to_csv(index=False))
+            write_csv(data, sys.stdout, type)
+        elif options.format == constants.NDJSON_FORMAT:
+            write_ndjson(data, sys.stdout)
         else:
             print(json.dumps(data, indent=2))
-        # NOTE: While this logic is here, unless validate_file_extensions
-        #       allows for other data types to export to CSV, this will
-        #       only include investment data.
+    elif options.format == constants.NDJSON_FORMAT:
+        with open(filename, "w") as f:
+            write_ndjson(data, f)
     elif options.format == constants.CSV_FORMAT:
-        # NOTE: Currently, investment_data, which is a flat JSON, is the only
-        #       type of data that uses this section.  So, if we open this up to
-        #       other non-flat JSON data, we will need to revisit this.
-        json_normalize(data).to_csv(filename, index=False)
+        with open(filename, "w", newline="") as f:
+            write_csv(data, f, type)
     elif options.format == constants.JSON_FORMAT:
         with open(filename, "w+") as f:
             json.dump(data, f, indent=2)
+    elif options.format in COLUMNAR_FORMATS:
+        if type in SCHEMAS:
+            partition_column = (
+                PARTITION_COLUMNS.get(type) if options.partition_by_month else None
+            )
+            write_table(
+                to_arrow_table(type, data), filename, options.format, partition_column
+            )
+        else:
+            # Scalars and nested documents (net worth, bills, credit data)
+            # have no tabular schema.
+            filename = "{}_{}.{}".format(
+                options.filename, type.lower(), constants.JSON_FORMAT
+            )
+            with open(filename, "w+") as f:
+                json.dump(data, f, indent=2)
+
+
+@dataclass
+class FetchTask:
+    """
+    A single dataset fetch in the CLI plan.  ``fetch`` receives the results of
+    the tasks listed in ``depends_on``, keyed by type.  Tasks that do not
+    ``need_sync`` may run before the account sync started at login finishes.
+    A ``stream`` task returns an iterator of records, which cannot be used by
+    other tasks.
+    """
+
+    type: str
+    fetch: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+    output: bool = True
+    needs_sync: bool = True
+    stream: bool = False
+
+
+def build_fetch_plan(
+    mint, options, report_type, trend_date_filter, transaction_date_filter
+):
+    plan = []
+
+    if options.trends:
+        plan.append(
+            FetchTask(
+                constants.TRENDS_KEY,
+                lambda results: mint.iter_trends(
+                    report_type=report_type,
+                    date_filter=trend_date_filter,
+                    start_date=options.start_date,
+                    end_date=options.end_date,
+                    category_ids=None,
+                    tag_ids=None,
+                    descriptions=None,
+                    account_ids=None,
+                    match_all_filters=True,
+                    page_size=min(options.limit, STREAM_PAGE_SIZE),
+                    max_records=options.limit,
+                    stream=True,
+                ),
+                stream=True,
+            )
+        )
+
+    if options.accounts or options.net_worth:
+        # Net worth is derived from the account payload, so the accounts are
+        # fetched once even when they are not output themselves.
+        plan.append(
+            FetchTask(
+                constants.ACCOUNT_KEY,
+                lambda results: mint.get_account_data(limit=options.limit),
+                output=options.accounts,
+            )
+        )
+
+    if options.bills:
+        plan.append(FetchTask(constants.BILL_KEY, lambda results: mint.get_bills()))
+
+    if options.budgets:
+        plan.append(
+            FetchTask(
+                constants.BUDGET_KEY,
+                lambda results: mint.get_budget_data(limit=options.limit),
+                needs_sync=False,
+            )
+        )
+    elif options.budget_hist:
+        plan.append(
+            FetchTask(
+                constants.BUDGET_KEY,
+                lambda results: mint.get_budget_data(limit=options.limit, hist=12),
+                needs_sync=False,
+            )
+        )
+
+    if options.transactions:
+        transaction_filters = dict(
+            date_filter=transaction_date_filter,
+            start_date=options.start_date,
+            end_date=options.end_date,
+            category_ids=None,
+            tag_ids=None,
+            descriptions=None,
+            account_ids=None,
+            match_all_filters=True,
+            include_investment=options.include_investment,
+            remove_pending=options.show_pending,
+        )
+
+        def fetch_transactions(results):
+            if options.shard_by:
+                return mint.get_transaction_data(
+                    limit=options.limit,
+                    offset=0,
+                    shard_by=options.shard_by,
+                    max_workers=options.max_workers,
+                    **transaction_filters,
+                )
+            # Streamed so that the writers can output each page as it arrives.
+            return mint.iter_transactions(
+                page_size=min(options.limit, STREAM_PAGE_SIZE),
+                max_records=options.limit,
+                stream=True,
+                **transaction_filters,
+            )
+
+        plan.append(
+            FetchTask(
+                constants.TRANSACTION_KEY,
+                fetch_transactions,
+                stream=not options.shard_by,
+            )
+        )
+
+    if options.categories:
+        plan.append(
+            FetchTask(
+                constants.CATEGORY_KEY,
+                lambda results: mint.get_category_data(
+                    limit=options.limit,
+                ),
+                needs_sync=False,
+            )
+        )
+
+    if options.investments:
+        plan.append(
+            FetchTask(
+                constants.INVESTMENT_KEY,
+                lambda results: mint.get_investment_data(
+                    limit=options.limit,
+                ),
+            )
+        )
+
+    if options.net_worth:
+        plan.append(
+            FetchTask(
+                constants.NET_WORTH_KEY,
+                lambda results: {
+                    "net_worth": mint.get_net_worth_data(results[constants.ACCOUNT_KEY])
+                },
+                depends_on=(constants.ACCOUNT_KEY,),
+            )
+        )
 
     if options.attention:
-        if attention_msg is None or attention_msg == "":
-            attention_msg = "no messages"
-        if options.filename is None:
-            print(attention_msg)
-        else:
-            with open(options.filename, "w+") as f:
-                f.write(attention_msg)
+        plan.append(
+            FetchTask(constants.ATTENTION_KEY, lambda results: mint.get_attention())
+        )
 
+    if options.credit_score:
+        plan.append(
+            FetchTask(
+                constants.CREDIT_SCORE_KEY,
+                lambda results: {"credit_score": mint.get_credit_score_data()},
+            )
+        )
 
-def main():
-    options = parse_arguments(sys.argv[1:])
+    if options.credit_report:
+        plan.append(
+            FetchTask(
+                constants.CREDIT_REPORT_KEY,
+                lambda results: mint.get_credit_report_data(
+                    details=True,
+                    exclude_inquiries=options.exclude_inquiries,
+                    exclude_accounts=options.exclude_accounts,
+                    exclude_utilization=options.exclude_utilization,
+                ),
+            )
+        )
+
+    return plan
+
+
+_END_OF_STREAM = object()
+
+
+def _put_record(records, record, stopped):
+    """Queues ``record`` for the writer; returns False if the plan was abandoned."""
+    while not stopped.is_set():
+        try:
+            records.put(record, timeout=STREAM_QUEUE_POLL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _run_fetch_task(task, dependencies, wait_for_sync=None, records=None, stopped=None):
+    if records is None:
+        results = {type: future.result() for type, future in dependencies.items()}
+        if task.needs_sync and wait_for_sync is not None:
+            wait_for_sync()
+        return task.fetch(results)
+
+    # Page through the stream here, in the worker, so that its requests
+    # overlap with the other fetches; the writer only drains the queue.
+    try:
+        for record in _run_fetch_task(task, dependencies, wait_for_sync):
+            if not _put_record(records, record, stopped):
+                break
+    finally:
+        _put_record(records, _END_OF_STREAM, stopped)
+
+
+def _drain_records(records, future, stopped):
+    """Yields the records a worker streams through ``records``."""
+    while True:
+        try:
+            record = records.get(timeout=STREAM_QUEUE_POLL)
+        except queue.Empty:
+            if stopped.is_set():
+                future.result()
+                raise RuntimeError("The fetch plan ended before the stream was read")
+            continue
+        if record is _END_OF_STREAM:
+            break
+        yield record
+    # Raises the error that ended the stream, if any
+    future.result()
+
+
+def _order_for_sync(plan):
+    """
+    Moves the tasks that neither need the account sync nor depend on a task
+    that does to the front of the plan, keeping dependencies before the tasks
+    using them.
+    """
+    needs_sync = {}
+    for task in plan:
+        needs_sync[task.type] = task.needs_sync or any(
+            needs_sync[type] for type in task.depends_on
+        )
+    return sorted(plan, key=lambda task: needs_sync[task.type])
+
+
+def run_fetch_plan(plan, max_workers=1, wait_for_sync=None):
+    """
+    Runs the fetch plan and yields ``(type, data)`` for each task to output, in
+    plan order.  With more than one worker, independent fetches run
+    concurrently and each result is yielded as soon as it (and everything
+    before it) is ready, so writing output overlaps with the remaining fetches.
+    Streamed tasks are paged through by their worker, and yielded as an
+    iterator over a bounded queue that must be consumed before the next
+    result is requested.  Dependencies must appear earlier in the plan than
+    the tasks using them.
+
+    When the account sync runs in the background, ``wait_for_sync`` is called
+    before each task that needs it, and the tasks that do not need the sync are
+    started (and yielded) first so that no worker waits on the sync before
+    them.
+    """
+    if wait_for_sync is not None:
+        plan = _order_for_sync(plan)
+
+    if max_workers <= 1:
+        results = {}
+        for task in plan:
+            if task.needs_sync and wait_for_sync is not None:
+                wait_for_sync()
+            results[task.type] = task.fetch(
+                {type: results[type] for type in task.depends_on}
+            )
+            if task.output:
+                yield task.type, results[task.type]
+        return
+
+    stopped = threading.Event()
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="mintapi"
+    ) as executor:
+        futures = {}
+        streams = {}
+        for task in plan:
+            if task.stream and task.output:
+                streams[task.type] = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+            # Tasks are started in submission order, so a dependency is always
+            # running or finished before a task waiting on it is started.
+            futures[task.type] = executor.submit(
+                _run_fetch_task,
+                task,
+                {type: futures[type] for type in task.depends_on},
+                wait_for_sync,
+                streams.get(task.type),
+                stopped,
+            )
+        try:
+            for task in plan:
+                if task.type in streams:
+                    yield task.type, _drain_records(
+                        streams[task.type], futures[task.type], stopped
+                    )
+                elif task.output:
+                    yield task.type, futures[task.type].result()
+        finally:
+            # Releases the workers still streaming if the plan is abandoned.
+            stopped.set()
 
+
+def get_credentials(options):
+    """Returns the Mint e-mail, password and IMAP password, prompting as needed."""
     # Try to get the e-mail and password from the arguments
     email = options.email
     password = options.password
-    imap_account = options.imap_account
     imap_password = options.imap_password
-    mfa_method = options.mfa_method
-    report_type = ReportView.Options(options.trend_report_type)
-    trend_date_filter = DateFilter.Options(options.trend_date_filter)
-    transaction_date_filter = DateFilter.Options(options.transaction_date_filter)
 
     if not email:
         # If the user did not provide an e-mail, prompt for it
@@ -431,45 +971,31 @@ def main():
         "mintapi", "Mint password: ", email, password, options.keyring
     )
 
-    if imap_account:
+    if options.imap_account:
         imap_password = handle_password(
             "mintapi_imap",
             "IMAP password: ",
-            imap_account,
+            options.imap_account,
             imap_password,
             options.keyring,
         )
+    return email, password, imap_password
 
-    if not any(
-        [
-            options.accounts,
-            options.bills,
-            options.budgets,
-            options.transactions,
-            options.trends,
-            options.net_worth,
-            options.credit_score,
-            options.credit_report,
-            options.investments,
-            options.attention,
-            options.categories,
-        ]
-    ):
-        options.accounts = True
 
+def create_mint(options, email, password, imap_password):
     if options.session_path == "None":
         session_path = None
     else:
         session_path = options.session_path
 
-    mint = Mint(
+    return Mint(
         email,
         password,
-        mfa_method=mfa_method,
+        mfa_method=options.mfa_method,
         mfa_token=options.mfa_token,
         session_path=session_path,
         headless=options.headless,
-        imap_account=imap_account,
+        imap_account=options.imap_account,
         imap_password=imap_password,
         imap_server=options.imap_server,
         imap_folder=options.imap_folder,
@@ -479,100 +1005,115 @@ def main():
         fail_if_stale=options.fail_if_stale,
         use_chromedriver_on_path=options.use_chromedriver_on_path,
         chromedriver_download_path=options.chromedriver_download_path,
+        chromedriver_version_ttl=options.chromedriver_version_ttl,
         beta=options.beta,
+        session_transport=options.session_transport,
+        # A saved session only holds Mint cookies; credit data needs the
+        # browser to load the credit domain.
+        reuse_session=options.reuse_session
+        and not (options.credit_score or options.credit_report),
+        session_ttl=options.session_ttl,
+        response_cache=(
+            ResponseCache(cache_dir=options.cache_dir) if options.cache_dir else None
+        ),
+        sync_in_background=options.sync_in_background,
+        sync_progress_callback=lambda message: logger.info(
+            "Account sync: {}".format(message)
+        ),
     )
-    atexit.register(mint.close)  # Ensure everything is torn down.
 
-    if options.imap_test:
-        mfa_code = get_email_code(
-            imap_account,
-            imap_password,
-            options.imap_server,
-            imap_folder=options.imap_folder,
-            delete=False,
-        )
-        print("MFA CODE:", mfa_code)
-        sys.exit()
 
-    attention_msg = None
-    if options.attention:
-        attention_msg = mint.get_attention()
+def run_daemon(args):
+    options = parse_arguments(args)
+    email, password, imap_password = get_credentials(options)
+    serve(
+        lambda: create_mint(options, email, password, imap_password),
+        host=options.daemon_host,
+        port=options.daemon_port,
+        token=options.daemon_token,
+        token_file=options.daemon_token_file,
+    )
 
-    if options.trends:
-        data = mint.get_trend_data(
-            report_type=report_type,
-            date_filter=trend_date_filter,
-            start_date=options.start_date,
-            end_date=options.end_date,
-            category_ids=None,
-            tag_ids=None,
-            descriptions=None,
-            account_ids=None,
-            match_all_filters=True,
-            limit=options.limit,
-            offset=0,
-        )
-        output_data(options, data, constants.TRENDS_KEY, attention_msg)
 
-    if options.accounts:
-        data = mint.get_account_data(limit=options.limit)
-        output_data(options, data, constants.ACCOUNT_KEY, attention_msg)
+def main():
+    if sys.argv[1:2] == ["daemon"]:
+        return run_daemon(sys.argv[2:])
+    if sys.argv[1:2] == ["batch"]:
+        from mintapi import batch
 
-    if options.bills:
-        data = mint.get_bills()
-        output_data(options, data, constants.BILL_KEY, attention_msg)
+        return batch.main(sys.argv[2:])
 
-    if options.budgets:
-        data = mint.get_budget_data(limit=options.limit)
-        output_data(options, data, constants.BUDGET_KEY, attention_msg)
-    elif options.budget_hist:
-        data = mint.get_budget_data(limit=options.limit, hist=12)
-        output_data(options, data, constants.BUDGET_KEY, attention_msg)
+    options = parse_arguments(sys.argv[1:])
 
-    if options.transactions:
-        data = mint.get_transaction_data(
-            date_filter=transaction_date_filter,
-            start_date=options.start_date,
-            end_date=options.end_date,
-            category_ids=None,
-            tag_ids=None,
-            descriptions=None,
-            account_ids=None,
-            match_all_filters=True,
-            include_investment=options.include_investment,
-            remove_pending=options.show_pending,
-            limit=options.limit,
-            offset=0,
-        )
-        output_data(options, data, constants.TRANSACTION_KEY, attention_msg)
+    report_type = ReportView.Options(options.trend_report_type)
+    trend_date_filter = DateFilter.Options(options.trend_date_filter)
+    transaction_date_filter = DateFilter.Options(options.transaction_date_filter)
 
-    if options.categories:
-        data = mint.get_category_data(
-            limit=options.limit,
-        )
-        output_data(options, data, constants.CATEGORY_KEY, attention_msg)
+    if not any(
+        [
+            options.accounts,
+            options.bills,
+            options.budgets,
+            options.transactions,
+            options.trends,
+            options.net_worth,
+            options.credit_score,
+            options.credit_report,
+            options.investments,
+            options.attention,
+            options.categories,
+        ]
+    ):
+        options.accounts = True
 
-    if options.investments:
-        data = mint.get_investment_data(
-            limit=options.limit,
+    if options.daemon_url:
+        mint = DaemonClient(
+            options.daemon_url,
+            options.daemon_token,
+            token_file=options.daemon_token_file,
         )
-        output_data(options, data, constants.INVESTMENT_KEY, attention_msg)
+        imap_password = None
+    else:
+        email, password, imap_password = get_credentials(options)
+        mint = create_mint(options, email, password, imap_password)
+    atexit.register(mint.close)  # Ensure everything is torn down.
 
-    if options.net_worth:
-        data = mint.get_net_worth_data()
-        formatted_data = {"net_worth": data}
-        output_data(options, formatted_data, constants.NET_WORTH_KEY, attention_msg)
+    sync_status = getattr(mint, "sync_status", None)
+    if (options.session_transport or options.reuse_session) and not (
+        options.credit_score or options.credit_report
+    ):
+        # Credit data still needs the browser to load the credit domain.
+        if sync_status is not None:
+            # The browser is watching the account sync until it finishes.
+            sync_status.add_done_callback(lambda status: mint.close_driver())
+        else:
+            mint.close_driver()
 
-    if options.credit_score:
-        data = mint.get_credit_score_data()
-        formatted_data = {"credit_score": data}
-        output_data(options, formatted_data, constants.CREDIT_SCORE_KEY, attention_msg)
+    if options.imap_test:
+        from mintapi.signIn import get_email_code
 
-    if options.credit_report:
-        data = mint.get_credit_report_data(
-            details=True,
-            exclude_inquiries=options.exclude_inquiries,
-            exclude_accounts=options.exclude_accounts,
-            exclude_utilization=options.exclude_utilization,
+        mfa_code = get_email_code(
+            options.imap_account,
+            imap_password,
+            options.imap_server,
+            imap_folder=options.imap_folder,
+            delete=False,
+            since=datetime.now(timezone.utc) - timedelta(days=7),
+            timeout=0,
         )
-        output_data(options, data, constants.CREDIT_REPORT_KEY, attention_msg)
+        print("MFA CODE:", mfa_code)
+        sys.exit()
+
+    plan = build_fetch_plan(
+        mint, options, report_type, trend_date_filter, transaction_date_filter
+    )
+    max_workers = options.max_workers if mint.supports_concurrent_requests else 1
+    store = SQLiteStore(options.database) if options.database else None
+    wait_for_sync = mint.wait_for_sync if sync_status is not None else None
+    for type, data in run_fetch_plan(plan, max_workers, wait_for_sync):
+        if store is not None and type in SQLITE_TABLES:
+            store.upsert(type, data)
+        else:
+            output_data(options, data, type)
+    if store is not None:
+        store.close()
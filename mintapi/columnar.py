@@ -0,0 +1,251 @@
+"""
+Columnar export helpers
+
+Converts Mint records into Apache Arrow tables with a fixed schema per dataset,
+and writes them as Parquet or Arrow IPC files, optionally partitioned by month.
+Nested values such as ``category.name`` are flattened into dotted columns and
+keys missing from a record become nulls, so every export of a dataset has the
+same columns and types regardless of what Mint returned.
+
+pyarrow is an optional dependency: ``pip install mintapi[arrow]``.
+"""
+
+import os
+from datetime import date, datetime, timezone
+
+from mintapi import constants
+
+COLUMNAR_FORMATS = (constants.PARQUET_FORMAT, constants.ARROW_FORMAT)
+
+MONTH_COLUMN = "month"
+
+# Column name (dotted paths reach into nested objects) and type, per dataset
+SCHEMAS = {
+    constants.ACCOUNT_KEY: [
+        ("id", "string"),
+        ("name", "string"),
+        ("type", "string"),
+        ("accountStatus", "string"),
+        ("currency", "string"),
+        ("fiName", "string"),
+        ("currentBalance", "float64"),
+        ("availableBalance", "float64"),
+        ("value", "float64"),
+        ("isActive", "bool"),
+        ("isClosed", "bool"),
+        ("createdDate", "timestamp"),
+        ("lastUpdatedDate", "timestamp"),
+    ],
+    constants.BUDGET_KEY: [
+        ("id", "string"),
+        ("type", "string"),
+        ("budgetDate", "date"),
+        ("amount", "float64"),
+        ("budgetAmount", "float64"),
+        ("budgetAdjustmentAmount", "float64"),
+        ("category.id", "string"),
+        ("category.name", "string"),
+        ("category.parentName", "string"),
+        ("performanceStatus", "string"),
+        ("createdDate", "timestamp"),
+        ("lastUpdatedDate", "timestamp"),
+    ],
+    constants.INVESTMENT_KEY: [
+        ("id", "string"),
+        ("accountId", "string"),
+        ("description", "string"),
+        ("cpAssetClass", "string"),
+        ("holdingType", "string"),
+        ("inceptionDate", "timestamp"),
+        ("initialTotalCost", "float64"),
+        ("initialQuantity", "float64"),
+        ("currentQuantity", "float64"),
+        ("currentPrice", "float64"),
+        ("currentValue", "float64"),
+        ("averagePricePaid", "float64"),
+        ("lastUpdatedDate", "timestamp"),
+    ],
+    constants.TRANSACTION_KEY: [
+        ("id", "string"),
+        ("date", "date"),
+        ("description", "string"),
+        ("amount", "float64"),
+        ("type", "string"),
+        ("accountId", "string"),
+        ("accountRef.name", "string"),
+        ("category.id", "string"),
+        ("category.name", "string"),
+        ("category.categoryType", "string"),
+        ("category.parentName", "string"),
+        ("status", "string"),
+        ("matchState", "string"),
+        ("discretionaryType", "string"),
+        ("isExpense", "bool"),
+        ("isPending", "bool"),
+        ("lastUpdatedDate", "timestamp"),
+    ],
+}
+
+# Column used to partition each dataset by month
+PARTITION_COLUMNS = {
+    constants.BUDGET_KEY: "budgetDate",
+    constants.TRANSACTION_KEY: "date",
+}
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "Arrow and Parquet output require pyarrow; "
+            "install it with `pip install mintapi[arrow]`."
+        ) from None
+    return pyarrow
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+def _to_date(value):
+    return date.fromisoformat(value[:10])
+
+
+def _to_timestamp(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+_CONVERTERS = {
+    "string": str,
+    "float64": float,
+    "bool": _to_bool,
+    "date": _to_date,
+    "timestamp": _to_timestamp,
+}
+
+
+def get_schema(name):
+    pa = import_pyarrow()
+    types = {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("s", tz="UTC"),
+    }
+    return pa.schema([(column, types[type]) for column, type in SCHEMAS[name]])
+
+
+def _get_path(record, path):
+    value = record
+    for key in path:
+        if value is None:
+            return None
+        value = value.get(key)
+    return value
+
+
+def _flatten(record, prefix=""):
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            yield from _flatten(value, prefix + key + ".")
+        else:
+            yield prefix + key, value
+
+
+def extract_columns(name, records, keep_unknown=False):
+    """
+    Collects the raw value of every schema column of the named dataset in a
+    single pass over an iterable of records.  Returns a dict of column name to
+    list of values, with None where a record lacks the key.  With
+    ``keep_unknown``, keys outside the schema are collected too (as dotted
+    columns, after the schema columns).
+    """
+    columns = {column: [] for column, _ in SCHEMAS[name]}
+    paths = [(column.split("."), columns[column]) for column in columns]
+    unknown = {}
+    count = 0
+    for record in records:
+        for path, values in paths:
+            values.append(_get_path(record, path))
+        count += 1
+        if keep_unknown:
+            for column, value in _flatten(record):
+                if column in columns:
+                    continue
+                values = unknown.get(column)
+                if values is None:
+                    values = unknown[column] = [None] * (count - 1)
+                values.append(value)
+            for values in unknown.values():
+                if len(values) < count:
+                    values.append(None)
+    columns.update(unknown)
+    return columns
+
+
+def to_arrow_table(name, records):
+    """
+    Builds an Arrow table with the stable schema of the named dataset (one of
+    the keys of ``SCHEMAS``) from an iterable of records.  Keys outside the
+    schema are dropped.
+    """
+    pa = import_pyarrow()
+    schema = get_schema(name)
+    columns = extract_columns(name, records)
+    arrays = []
+    for (column, type), field in zip(SCHEMAS[name], schema):
+        convert = _CONVERTERS[type]
+        values = [
+            None if value is None else convert(value) for value in columns[column]
+        ]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_file(table, path, format):
+    pa = import_pyarrow()
+    if format == constants.PARQUET_FORMAT:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+    elif format == constants.ARROW_FORMAT:
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError("Unsupported columnar format: {}".format(format))
+
+
+def write_table(table, path, format, partition_column=None):
+    """
+    Writes a table as a single Parquet or Arrow IPC file at ``path``.  With a
+    ``partition_column``, ``path`` is a directory instead, holding one
+    Hive-style ``month=YYYY-MM`` sub-directory per month of that date column.
+    Returns the list of files written.
+    """
+    if partition_column is None:
+        _write_file(table, path, format)
+        return [path]
+
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    months = pc.strftime(table[partition_column], format="%Y-%m")
+    partitions = [
+        (month, pc.equal(months, pa.scalar(month)))
+        for month in sorted(m for m in pc.unique(months).to_pylist() if m is not None)
+    ]
+    if months.null_count:
+        partitions.append(("unknown", pc.is_null(months)))
+    paths = []
+    for month, mask in partitions:
+        directory = os.path.join(path, "{}={}".format(MONTH_COLUMN, month))
+        os.makedirs(directory, exist_ok=True)
+        file_path = os.path.join(directory, "part-0.{}".format(format))
+        _write_file(table.filter(mask), file_path, format)
+        paths.append(file_path)
+    return paths
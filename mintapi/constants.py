@@ -1,5 +1,8 @@
 JSON_FORMAT = "json"
+NDJSON_FORMAT = "ndjson"
 CSV_FORMAT = "csv"
+PARQUET_FORMAT = "parquet"
+ARROW_FORMAT = "arrow"
 
 GET_METHOD = "GET"
 POST_METHOD = "POST"
@@ -14,6 +17,7 @@ NET_WORTH_KEY = "Net_Worth"
 CREDIT_SCORE_KEY = "Credit_Score"
 CREDIT_REPORT_KEY = "Credit_Report"
 TRENDS_KEY = "Trend"
+ATTENTION_KEY = "Attention"
 
 MINT_ROOT_URL = "https://mint.intuit.com"
 MINT_BETA_ROOT_URL = "https://beta.mint.intuit.com"
@@ -0,0 +1,350 @@
+"""
+Signed-in browser daemon
+
+``mintapi daemon`` signs in once and keeps the ``Mint`` instance alive, serving
+data calls to short-lived clients over HTTP on localhost.  Clients (the CLI
+with ``--daemon-url``, or ``DaemonClient`` from Python) then skip the browser
+launch and sign in entirely.  Calls are serialised, as the web driver is not
+thread safe.  When a call fails because the Mint session expired, the daemon
+signs in again and retries the call once.
+
+The protocol is a single JSON endpoint::
+
+    POST /call  {"method": "get_account_data", "args": [], "kwargs": {"limit": 10}}
+    -> 200 {"result": [...]}
+
+Requests must carry ``Authorization: Bearer <token>``.  When the daemon is
+started without a token it generates one, and it writes the token to a file
+only the current user can read (``~/.mintapi/daemon-token`` by default), where
+clients pick it up.
+"""
+
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator, Mapping
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mintapi.filters import DateFilter
+from mintapi.trends import ReportView
+
+logger = logging.getLogger("mintapi")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".mintapi", "daemon-token")
+CALL_PATH = "/call"
+HEALTH_PATH = "/health"
+
+# Mint methods that may be called through the daemon.  Iterators are
+# returned as lists.
+DAEMON_METHODS = frozenset(
+    [
+        "get_account_data",
+        "get_attention",
+        "get_bills",
+        "get_budget_data",
+        "get_category_data",
+        "get_credit_report_data",
+        "get_credit_score_data",
+        "get_investment_data",
+        "get_net_worth_data",
+        "get_transaction_data",
+        "get_trend_data",
+        "iter_transactions",
+        "iter_trends",
+    ]
+)
+
+# Enums travel by name; keyword arguments holding one are converted back
+# before the call.
+DAEMON_ENUM_KWARGS = {
+    "date_filter": DateFilter.Options,
+    "report_type": ReportView.Options,
+}
+
+
+class DaemonError(Exception):
+    pass
+
+
+def _to_json(value):
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Iterator):
+        return list(value)
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
+
+
+def _dumps(value):
+    return json.dumps(value, default=_to_json).encode()
+
+
+def _decode_enums(kwargs):
+    kwargs = dict(kwargs)
+    for name, enum in DAEMON_ENUM_KWARGS.items():
+        value = kwargs.get(name)
+        if isinstance(value, str):
+            try:
+                kwargs[name] = enum[value]
+            except KeyError:
+                raise ValueError("Invalid {}: {}".format(name, value)) from None
+    return kwargs
+
+
+def write_token_file(token_file, token):
+    """Saves ``token`` to ``token_file``, readable by the current user only."""
+    os.makedirs(os.path.dirname(os.path.abspath(token_file)), exist_ok=True)
+    fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+
+
+def read_token_file(token_file):
+    """Returns the token saved in ``token_file``, or None if there is none."""
+    try:
+        with open(token_file) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class MintDaemon:
+    """
+    Holds a signed in ``Mint`` and runs whitelisted calls on it.
+
+    Parameters
+    ----------
+    mint_factory : Callable[[], Mint]
+        signs in and returns a new ``Mint``; called again to re-authenticate
+    """
+
+    def __init__(self, mint_factory):
+        self.mint_factory = mint_factory
+        self.mint = None
+        self._lock = threading.Lock()
+
+    def sign_in(self):
+        with self._lock:
+            self._sign_in()
+
+    def _sign_in(self):
+        if self.mint is not None:
+            self.mint.close()
+            self.mint = None
+        self.mint = self.mint_factory()
+
+    def _session_is_valid(self):
+        try:
+            return self.mint._probe_session()
+        except Exception:
+            return False
+
+    def call(self, method, args=None, kwargs=None):
+        """Runs ``method`` on the Mint instance, signing in again if needed."""
+        if method not in DAEMON_METHODS:
+            raise ValueError(
+                "Method not available through the daemon: {}".format(method)
+            )
+        args = args or []
+        kwargs = _decode_enums(kwargs or {})
+        with self._lock:
+            if self.mint is None:
+                self._sign_in()
+            try:
+                return self._call(method, args, kwargs)
+            except TypeError:
+                raise
+            except Exception:
+                if self._session_is_valid():
+                    raise
+                logger.info("Mint session expired; signing in again")
+                self._sign_in()
+                return self._call(method, args, kwargs)
+
+    def _call(self, method, args, kwargs):
+        result = getattr(self.mint, method)(*args, **kwargs)
+        if isinstance(result, Iterator):
+            result = list(result)
+        return result
+
+    def close(self):
+        with self._lock:
+            if self.mint is not None:
+                self.mint.close()
+                self.mint = None
+
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    server_version = "mintapi-daemon"
+
+    def log_message(self, format, *args):
+        logger.debug("daemon: " + format, *args)
+
+    def _send(self, status, body):
+        data = _dumps(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        expected = "Bearer {}".format(self.server.token)
+        return hmac.compare_digest(
+            self.headers.get("Authorization", "").encode(), expected.encode()
+        )
+
+    def do_GET(self):
+        if not self._authorized():
+            self._send(401, {"error": "Unauthorized"})
+        elif self.path == HEALTH_PATH:
+            self._send(200, {"status": "ok"})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            self._send(401, {"error": "Unauthorized"})
+            return
+        if self.path != CALL_PATH:
+            self._send(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            method = request["method"]
+            args, kwargs = request.get("args"), request.get("kwargs")
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": "Invalid request: {}".format(e)})
+            return
+        try:
+            result = self.server.mint_daemon.call(method, args, kwargs)
+        except (TypeError, ValueError) as e:
+            self._send(400, {"error": str(e), "type": type(e).__name__})
+        except Exception as e:
+            logger.exception(e)
+            self._send(500, {"error": str(e), "type": type(e).__name__})
+        else:
+            self._send(200, {"result": result})
+
+
+def make_server(daemon, token, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Returns an HTTP server for ``daemon``; call ``serve_forever`` to run it."""
+    if not token:
+        raise ValueError("The Mint daemon requires a token")
+    server = ThreadingHTTPServer((host, port), _DaemonRequestHandler)
+    server.daemon_threads = True
+    server.mint_daemon = daemon
+    server.token = token
+    return server
+
+
+def serve(
+    mint_factory,
+    host=DEFAULT_HOST,
+    port=DEFAULT_PORT,
+    token=None,
+    token_file=DEFAULT_TOKEN_FILE,
+):
+    """
+    Signs in, then serves calls until interrupted.  A token is generated when
+    none is given, and the token is saved to ``token_file`` while the daemon
+    runs.
+    """
+    token = token or secrets.token_urlsafe(32)
+    daemon = MintDaemon(mint_factory)
+    daemon.sign_in()
+    server = make_server(daemon, token, host, port)
+    if token_file is not None:
+        write_token_file(token_file, token)
+    logger.info("Mint daemon listening on {}:{}".format(*server.server_address[:2]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.close()
+        if token_file is not None:
+            try:
+                os.remove(token_file)
+            except OSError:
+                pass
+
+
+class DaemonClient:
+    """
+    Stands in for ``Mint``, forwarding the whitelisted data calls to a running
+    daemon.
+
+    Parameters
+    ----------
+    url : str
+        base URL of the daemon, e.g. "http://127.0.0.1:8765"
+    token : Optional[str], optional
+        token the daemon was started with, by default the one in ``token_file``
+    timeout : Optional[float], optional
+        seconds to wait for a call, by default None (no timeout)
+    token_file : Optional[str], optional
+        file the daemon saved its token to, by default ~/.mintapi/daemon-token
+    """
+
+    # Calls are serialised by the daemon.
+    supports_concurrent_requests = False
+
+    def __init__(self, url, token=None, timeout=None, token_file=DEFAULT_TOKEN_FILE):
+        self.url = url.rstrip("/")
+        if token is None and token_file is not None:
+            token = read_token_file(token_file)
+        self.token = token
+        self.timeout = timeout
+
+    def __getattr__(self, name):
+        if name not in DAEMON_METHODS:
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def call(self, method, *args, **kwargs):
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = "Bearer {}".format(self.token)
+        request = urllib.request.Request(
+            self.url + CALL_PATH,
+            data=_dumps({"method": method, "args": args, "kwargs": kwargs}),
+            headers=headers,
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)["result"]
+        except urllib.error.HTTPError as e:
+            try:
+                body = json.load(e)
+            except ValueError:
+                body = {"error": e.reason}
+            raise DaemonError(
+                "Mint daemon call {} failed ({}): {}".format(
+                    method, e.code, body.get("error")
+                )
+            ) from e
+
+    def close(self):
+        # The daemon keeps its browser; there is nothing to tear down here.
+        pass
+
+    def close_driver(self):
+        pass
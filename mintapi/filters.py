@@ -4,6 +4,7 @@ General Filters helper classes
 
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass, field
+from datetime import date, datetime
 from enum import Enum
 from typing import List, Optional, Union
 
@@ -74,6 +75,32 @@ class TagNameFilter(MatchFilter):
         return {"type": "TagNameFilter", "tagName": self.value, "exclude": True}
 
 
+@dataclass
+class TransactionStatusFilter(MatchFilter):
+    value: str
+    exclude: bool = False
+
+    def to_dict(self):
+        return {
+            "type": "TransactionStatusFilter",
+            "status": self.value,
+            "exclude": self.exclude,
+        }
+
+
+@dataclass
+class TransactionTypeFilter(MatchFilter):
+    value: str
+    exclude: bool = False
+
+    def to_dict(self):
+        return {
+            "type": "TransactionTypeFilter",
+            "transactionType": self.value,
+            "exclude": self.exclude,
+        }
+
+
 @dataclass
 class DateFilter:
     class Options(Enum):
@@ -114,10 +141,19 @@ class DateFilter:
     def to_dict(self):
         filter_clause = {"dateFilter": {"type": self.date_filter}}
         if self.date_filter == self.Options.CUSTOM.name:
-            filter_clause["dateFilter"]["startDate"] = self.start_date
-            filter_clause["dateFilter"]["endDate"] = self.end_date
+            filter_clause["dateFilter"]["startDate"] = self._format_date(
+                self.start_date
+            )
+            filter_clause["dateFilter"]["endDate"] = self._format_date(self.end_date)
         return filter_clause
 
+    @staticmethod
+    def _format_date(value):
+        # Dates are parsed into datetimes by the api; send them as ISO dates
+        if isinstance(value, (date, datetime)):
+            return value.strftime("%Y-%m-%d")
+        return value
+
 
 @dataclass
 class SearchFilter:
@@ -0,0 +1,83 @@
+"""
+pandas DataFrame helpers
+
+Builds typed DataFrames for accounts, budgets, investments and transactions.
+The columns are those of ``mintapi.columnar.SCHEMAS`` (nested values appear as
+dotted columns such as ``category.name``), collected in a single pass over the
+records and then converted column by column: dates become ``datetime64``,
+amounts ``float64``, flags nullable ``boolean`` and low-cardinality labels
+``category``.  Fields outside the schema are kept as ``object`` columns after
+the typed ones.
+"""
+
+import pandas as pd
+
+from mintapi import constants
+from mintapi.columnar import SCHEMAS, extract_columns
+
+# Columns stored as pandas categoricals, per dataset
+CATEGORICAL_COLUMNS = {
+    constants.ACCOUNT_KEY: ("type", "accountStatus", "currency", "fiName"),
+    constants.BUDGET_KEY: ("type", "category.id", "category.name", "performanceStatus"),
+    constants.INVESTMENT_KEY: ("accountId", "cpAssetClass", "holdingType"),
+    constants.TRANSACTION_KEY: (
+        "type",
+        "accountId",
+        "accountRef.name",
+        "category.id",
+        "category.name",
+        "category.categoryType",
+        "category.parentName",
+        "status",
+        "matchState",
+        "discretionaryType",
+    ),
+}
+
+
+def _to_series(values, type, categorical):
+    if type == "date":
+        return pd.to_datetime(pd.Series(values, dtype=object), format="%Y-%m-%d")
+    if type == "timestamp":
+        return pd.to_datetime(
+            pd.Series(values, dtype=object), format="%Y-%m-%dT%H:%M:%SZ", utc=True
+        )
+    if type == "float64":
+        return pd.to_numeric(pd.Series(values, dtype=object)).astype("float64")
+    if type == "bool":
+        # Some endpoints send flags as "true"/"false" strings.
+        series = pd.Series(values, dtype=object)
+        strings = series.map(lambda value: isinstance(value, str))
+        if strings.any():
+            series[strings] = series[strings].str.lower() == "true"
+        return series.astype("boolean")
+    if categorical:
+        return pd.Series(values, dtype="category")
+    return pd.Series(values, dtype=object)
+
+
+def to_frame(name, records):
+    """
+    Builds a DataFrame with the typed columns of the named dataset (one of the
+    keys of ``SCHEMAS``) from an iterable of records, followed by any other
+    fields of the records as ``object`` columns.
+    """
+    columns = extract_columns(name, records, keep_unknown=True)
+    categorical = CATEGORICAL_COLUMNS[name]
+    types = dict(SCHEMAS[name])
+    return pd.DataFrame(
+        {
+            column: _to_series(values, types.get(column), column in categorical)
+            for column, values in columns.items()
+        }
+    )
+
+
+def filter_transaction_frame(frame, include_investment, remove_pending):
+    """Vectorized equivalent of the pending and investment transaction filters."""
+    mask = pd.Series(True, index=frame.index)
+    if remove_pending:
+        mask &= ~frame["isPending"].fillna(False)
+    if not include_investment:
+        mask &= frame["type"] != "InvestmentTransaction"
+    return frame[mask].reset_index(drop=True)
@@ -0,0 +1,337 @@
+"""
+IMAP helper classes
+
+``EmailCodeRetriever`` waits for the email Mint sends during email MFA and
+returns the code in it.  New mail is awaited with IMAP IDLE (RFC 2177) when
+the server supports it, and with a short, backing-off poll otherwise.  Only
+messages from Mint received since the code was requested are searched, and
+their headers are fetched first; a message body is only downloaded when the
+code is not in the subject.
+
+``connect_in_background`` logs in on a separate thread so that the TLS
+handshake and login overlap with the browser part of the sign in.
+"""
+
+import email
+import email.header
+import email.utils
+import imaplib
+import logging
+import re
+import select
+import ssl
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger("mintapi")
+
+MINT_SENDER = "do_not_reply@intuit.com"
+CODE_SUBJECT_PATTERN = re.compile(r"(\d\d\d\d\d\d) Mint code")
+ACCOUNT_SUBJECT_PATTERN = re.compile("Your Mint Account", re.IGNORECASE)
+CODE_BODY_PATTERN = re.compile(r"Verification code:<.*?(\d\d\d\d\d\d)\b", re.S | re.M)
+HEADER_FIELDS = "(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM DATE)])"
+BODY_FIELDS = "(BODY.PEEK[])"
+
+# Seconds to wait for the code email
+DEFAULT_TIMEOUT = 200
+# Seconds a message may be dated before the code was requested (clock skew)
+DEFAULT_MAX_CLOCK_SKEW = 60
+# A single IDLE is ended after this many seconds so the mailbox is re-checked
+IDLE_CYCLE = 30
+# Seconds to wait for the server to acknowledge IDLE and DONE
+IDLE_RESPONSE_TIMEOUT = 10
+MIN_POLL_INTERVAL = 1
+MAX_POLL_INTERVAL = 10
+POLL_BACKOFF = 1.5
+
+# IMAP dates use English month names, whatever the locale
+IMAP_MONTHS = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+
+def connect(imap_server, imap_account, imap_password):
+    """Returns an IMAP client logged in to ``imap_server``."""
+    try:
+        imap_client = imaplib.IMAP4_SSL(imap_server)
+    except (imaplib.IMAP4.error, OSError):
+        raise RuntimeError("Unable to establish IMAP Client")
+
+    try:
+        imap_client.login(imap_account, imap_password)
+    except imaplib.IMAP4.error:
+        raise RuntimeError("Unable to login to IMAP Email")
+    return imap_client
+
+
+def connect_in_background(imap_server, imap_account, imap_password):
+    """
+    Starts ``connect`` on a daemon thread and returns a ``Future`` for the
+    logged in client.
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(connect(imap_server, imap_account, imap_password))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="mintapi-imap-connect", daemon=True).start()
+    return future
+
+
+def close_in_background(future):
+    """Logs out the client of a ``connect_in_background`` future once it is ready."""
+
+    def logout(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            future.result().logout()
+        except (imaplib.IMAP4.error, OSError):
+            logger.debug("Error logging out of IMAP", exc_info=True)
+
+    future.add_done_callback(logout)
+
+
+def supports_idle(client):
+    return "IDLE" in getattr(client, "capabilities", ())
+
+
+def format_imap_date(date):
+    return "{}-{}-{}".format(date.day, IMAP_MONTHS[date.month - 1], date.year)
+
+
+def _has_buffered_data(client):
+    """
+    Whether imaplib's reader holds (or can read without blocking) data, which
+    select cannot see once it has left the socket.
+    """
+    sock = client.sock
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        return bool(client.file.peek(1))
+    except (BlockingIOError, ssl.SSLWantReadError):
+        return False
+    finally:
+        sock.settimeout(timeout)
+
+
+def _wait_for_line(client, timeout):
+    """Waits up to ``timeout`` seconds for a response line to read."""
+    if _has_buffered_data(client):
+        return True
+    return bool(select.select([client.sock], [], [], max(timeout, 0))[0])
+
+
+def _is_new_mail(line):
+    return line.startswith(b"*") and line.rstrip().endswith((b"EXISTS", b"RECENT"))
+
+
+def idle(client, timeout):
+    """
+    Waits up to ``timeout`` seconds in IMAP IDLE for the server to report new
+    mail in the selected folder.  Returns True if it did.  Lines are read
+    through imaplib's own reader, so nothing it has buffered is skipped or
+    lost.
+    """
+    tag = client._new_tag()
+    client.send(tag + b" IDLE\r\n")
+    new_mail = False
+    # Untagged responses may arrive before the continuation request.
+    while True:
+        if not _wait_for_line(client, IDLE_RESPONSE_TIMEOUT):
+            raise imaplib.IMAP4.abort("No response to IDLE")
+        line = client._get_line()
+        if line.startswith(b"+"):
+            break
+        if line.startswith(tag):
+            raise imaplib.IMAP4.error("IDLE was not accepted: {}".format(line))
+        new_mail = new_mail or _is_new_mail(line)
+
+    deadline = time.monotonic() + timeout
+    while not new_mail and _wait_for_line(client, deadline - time.monotonic()):
+        new_mail = _is_new_mail(client._get_line())
+
+    client.send(b"DONE\r\n")
+    while True:
+        if not _wait_for_line(client, IDLE_RESPONSE_TIMEOUT):
+            raise imaplib.IMAP4.abort("No response to IDLE DONE")
+        if client._get_line().startswith(tag):
+            return new_mail
+
+
+def _decode_header(value):
+    if value is None:
+        return ""
+    return str(email.header.make_header(email.header.decode_header(value)))
+
+
+class EmailCodeRetriever:
+    """
+    Waits for the Mint MFA code email and returns the code in it.
+
+    Parameters
+    ----------
+    client : imaplib.IMAP4
+        logged in IMAP client, or any object with the same methods
+    folder : str, optional
+        folder that receives the MFA email, by default "INBOX"
+    since : Optional[datetime], optional
+        when the code was requested, by default now
+    timeout : int, optional
+        seconds to wait for the email, by default 200
+    delete : bool, optional
+        delete the email once the code is read, by default True
+    max_clock_skew : int, optional
+        seconds an email may be dated before ``since``, by default 60
+    """
+
+    def __init__(
+        self,
+        client,
+        folder="INBOX",
+        since=None,
+        timeout=DEFAULT_TIMEOUT,
+        delete=True,
+        max_clock_skew=DEFAULT_MAX_CLOCK_SKEW,
+    ):
+        self.client = client
+        self.folder = folder
+        self.since = since or datetime.now(timezone.utc)
+        if self.since.tzinfo is None:
+            self.since = self.since.astimezone()
+        self.timeout = timeout
+        self.delete = delete
+        self.max_clock_skew = max_clock_skew
+        self._seen = set()
+
+    def get_code(self):
+        """Returns the MFA code, or None if it did not arrive in time."""
+        try:
+            return self._get_code()
+        except imaplib.IMAP4.error as e:
+            raise RuntimeError(
+                "IMAP error while waiting for the Mint code: {}".format(e)
+            ) from e
+
+    def _get_code(self):
+        deadline = time.monotonic() + self.timeout
+        use_idle = supports_idle(self.client)
+        interval = MIN_POLL_INTERVAL
+
+        rv, data = self.client.select(self.folder)
+        if rv != "OK":
+            raise RuntimeError("Unable to open mailbox: " + rv)
+
+        while True:
+            code = self.check()
+            if code is not None:
+                return code
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning("No Mint code email arrived within the timeout")
+                return None
+            if use_idle:
+                try:
+                    idle(self.client, min(remaining, IDLE_CYCLE))
+                except imaplib.IMAP4.abort:
+                    raise
+                except imaplib.IMAP4.error as e:
+                    logger.warning("IMAP IDLE failed, polling instead: {}".format(e))
+                    use_idle = False
+            else:
+                time.sleep(min(interval, remaining))
+                interval = min(interval * POLL_BACKOFF, MAX_POLL_INTERVAL)
+                self.client.noop()
+
+    def check(self):
+        """Checks the messages that arrived since the last check for the code."""
+        since_date = (self.since - timedelta(days=1)).date()
+        rv, data = self.client.search(
+            None,
+            "FROM",
+            '"{}"'.format(MINT_SENDER),
+            "SINCE",
+            format_imap_date(since_date),
+        )
+        if rv != "OK":
+            raise RuntimeError("Unable to search the Email folder: " + rv)
+
+        nums = [num for num in data[0].split() if num not in self._seen]
+        if not nums:
+            return None
+        self._seen.update(nums)
+
+        rv, data = self.client.fetch(b",".join(nums), HEADER_FIELDS)
+        if rv != "OK":
+            raise RuntimeError("Unable to complete due to error message: " + rv)
+        headers = {
+            item[0].split()[0]: email.message_from_bytes(item[1])
+            for item in data
+            if isinstance(item, tuple)
+        }
+
+        # Newest first
+        for num in reversed(nums):
+            message = headers.get(num)
+            if message is None or not self._is_recent_mint_email(message):
+                continue
+            subject = _decode_header(message["Subject"])
+            match = CODE_SUBJECT_PATTERN.search(subject)
+            if match:
+                code = match.group(1)
+            elif ACCOUNT_SUBJECT_PATTERN.search(subject):
+                code = self._get_body_code(num)
+            else:
+                continue
+            if code is not None:
+                if self.delete:
+                    self.client.store(num, "+FLAGS", "\\Deleted")
+                    self.client.expunge()
+                return code
+        return None
+
+    def _is_recent_mint_email(self, message):
+        if not re.search(MINT_SENDER, _decode_header(message["From"]), re.IGNORECASE):
+            return False
+        try:
+            date = email.utils.parsedate_to_datetime(message["Date"])
+        except (TypeError, ValueError):
+            logger.error("Unable to parse the date of a Mint email")
+            return False
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        return date >= self.since - timedelta(seconds=self.max_clock_skew)
+
+    def _get_body_code(self, num):
+        rv, data = self.client.fetch(num, BODY_FIELDS)
+        if rv != "OK":
+            raise RuntimeError("Unable to complete due to error message: " + rv)
+        message = email.message_from_bytes(data[0][1])
+        for part in message.walk():
+            payload = part.get_payload(decode=True)
+            if not payload:
+                continue
+            match = CODE_BODY_PATTERN.search(payload.decode(errors="replace"))
+            if match:
+                return match.group(1)
+        logger.error("No verification code found in the Mint email")
+        return None
@@ -0,0 +1,196 @@
+"""
+Record model helper classes
+
+Compact, typed alternatives to the per-row dicts returned by ``Mint.get_data``.
+Known fields live in ``__slots__`` and anything else Mint returns is kept in a
+small overflow dict, so no information is lost.  Records are read-only
+``Mapping``s, so existing code using ``record["amount"]`` keeps working, and
+dates are only parsed when asked for.
+"""
+
+from collections.abc import Mapping
+from datetime import datetime
+
+from mintapi import constants
+
+
+class Record(Mapping):
+    __slots__ = ("_extra",)
+    _field_set = frozenset()
+
+    def __init__(self, data):
+        extra = None
+        for key, value in data.items():
+            if key in self._field_set:
+                setattr(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._extra = extra
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for key in self.__slots__:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self.to_dict())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def get_datetime(self, key):
+        """
+        Parses a date field on demand.  Handles both dates ("2022-03-24") and
+        UTC timestamps ("2022-03-25T00:11:08Z"); returns None if missing.
+        """
+        value = self.get(key)
+        if value is None:
+            return None
+        if len(value) == 10:
+            return datetime.strptime(value, "%Y-%m-%d")
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+
+
+class Account(Record):
+    __slots__ = (
+        "id",
+        "type",
+        "name",
+        "value",
+        "currentBalance",
+        "availableBalance",
+        "currency",
+        "fiName",
+        "fiLoginId",
+        "accountStatus",
+        "systemStatus",
+        "isActive",
+        "isClosed",
+        "isVisible",
+        "createdDate",
+        "lastUpdatedDate",
+    )
+    _field_set = frozenset(__slots__)
+
+
+class Transaction(Record):
+    __slots__ = (
+        "id",
+        "type",
+        "date",
+        "description",
+        "amount",
+        "accountId",
+        "accountRef",
+        "category",
+        "fiData",
+        "status",
+        "matchState",
+        "etag",
+        "isExpense",
+        "isPending",
+        "discretionaryType",
+        "isLinkedToRule",
+        "transactionReviewState",
+        "lastUpdatedDate",
+    )
+    _field_set = frozenset(__slots__)
+
+
+class Budget(Record):
+    __slots__ = (
+        "id",
+        "type",
+        "budgetDate",
+        "amount",
+        "budgetAmount",
+        "budgetAdjustmentAmount",
+        "category",
+        "rollover",
+        "reset",
+        "rolloverResetAmount",
+        "subsumed",
+        "performanceStatus",
+        "createdDate",
+        "lastUpdatedDate",
+    )
+    _field_set = frozenset(__slots__)
+
+
+class Category(Record):
+    __slots__ = (
+        "id",
+        "type",
+        "name",
+        "depth",
+        "categoryType",
+        "parentId",
+        "isBusiness",
+        "isCustom",
+        "isUnassignable",
+        "isUnbudgetable",
+        "isUntrendable",
+        "isIgnored",
+        "isEditable",
+        "isDeleted",
+        "discretionaryType",
+        "lastUpdatedDate",
+    )
+    _field_set = frozenset(__slots__)
+
+
+class Investment(Record):
+    __slots__ = (
+        "id",
+        "accountId",
+        "cpSrcElementId",
+        "description",
+        "cpAssetClass",
+        "holdingType",
+        "initialTotalCost",
+        "inceptionDate",
+        "initialQuantity",
+        "currentQuantity",
+        "currentPrice",
+        "currentValue",
+        "averagePricePaid",
+        "lastUpdatedDate",
+    )
+    _field_set = frozenset(__slots__)
+
+
+class Trend(Record):
+    __slots__ = (
+        "type",
+        "date",
+        "amount",
+        "inverseAmount",
+    )
+    _field_set = frozenset(__slots__)
+
+
+MODELS = {
+    constants.ACCOUNT_KEY: Account,
+    constants.BUDGET_KEY: Budget,
+    constants.CATEGORY_KEY: Category,
+    constants.INVESTMENT_KEY: Investment,
+    constants.TRANSACTION_KEY: Transaction,
+    constants.TRENDS_KEY: Trend,
+}
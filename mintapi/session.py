@@ -0,0 +1,77 @@
+"""
+Persisted session helpers
+
+After a successful sign in, the authenticated cookie jar and API key header can
+be written to the session directory so that later runs may skip the browser
+entirely while the saved session is still accepted by Mint.
+"""
+
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger("mintapi")
+
+SESSION_FILENAME = "mintapi_session.json"
+DEFAULT_SESSION_TTL = 12 * 60 * 60
+
+
+def get_session_file(session_path):
+    return os.path.join(session_path, SESSION_FILENAME)
+
+
+def save_session(
+    session_path, cookies, api_key_header, headers=None, ttl=DEFAULT_SESSION_TTL
+):
+    """
+    Writes the authenticated session to the session directory.
+
+    Parameters
+    ----------
+    session_path : str
+        directory used for the persisted session
+    cookies : List[Dict]
+        cookies in the format returned by ``driver.get_cookies()``
+    api_key_header : Dict
+        authorization header used for Mint API requests
+    headers : Dict, optional
+        additional headers to replay (e.g. the browser user agent), by default None
+    ttl : int, optional
+        number of seconds the saved session is trusted for, by default 12 hours
+    """
+    os.makedirs(session_path, exist_ok=True)
+    session = {
+        "expires": time.time() + ttl,
+        "cookies": cookies,
+        "apiKeyHeader": api_key_header,
+        "headers": headers or {},
+    }
+    # The file holds live credentials, so only the current user may read it.
+    fd = os.open(
+        get_session_file(session_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+    )
+    with os.fdopen(fd, "w") as f:
+        json.dump(session, f)
+
+
+def load_session(session_path):
+    """Returns the saved session, or None if it is missing, unreadable or expired."""
+    try:
+        with open(get_session_file(session_path)) as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if session.get("expires", 0) < time.time():
+        logger.info("Saved Mint session has expired")
+        delete_session(session_path)
+        return None
+    return session
+
+
+def delete_session(session_path):
+    try:
+        os.remove(get_session_file(session_path))
+    except OSError:
+        pass
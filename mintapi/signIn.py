@@ -1,15 +1,14 @@
-from datetime import datetime
-from mintapi import constants, exceptions
-import email
-import email.header
-import imaplib
+from mintapi import constants, exceptions, imap
+import contextlib
 import io
+import json
 import logging
 import os
 import re
 import requests
 import subprocess
 import sys
+import threading
 import time
 import zipfile
 import itertools
@@ -82,104 +81,28 @@ STANDARD_MISSING_EXCEPTIONS = (
 )
 
 
-def get_email_code(imap_account, imap_password, imap_server, imap_folder, delete=True):
-    code = None
-    try:
-        imap_client = imaplib.IMAP4_SSL(imap_server)
-    except imaplib.IMAP4.error:
-        raise RuntimeError("Unable to establish IMAP Client")
-
+def get_email_code(
+    imap_account,
+    imap_password,
+    imap_server,
+    imap_folder,
+    delete=True,
+    since=None,
+    imap_client=None,
+    timeout=imap.DEFAULT_TIMEOUT,
+):
+    # A client passed in (e.g. pre-warmed during sign in) stays open; its
+    # owner logs it out.
+    owns_client = imap_client is None
+    if owns_client:
+        imap_client = imap.connect(imap_server, imap_account, imap_password)
     try:
-        rv, data = imap_client.login(imap_account, imap_password)
-    except imaplib.IMAP4.error:
-        raise RuntimeError("Unable to login to IMAP Email")
-
-    code = ""
-    for c in range(20):
-        time.sleep(10)
-        rv, data = imap_client.select(imap_folder)
-        if rv != "OK":
-            raise RuntimeError("Unable to open mailbox: " + rv)
-
-        rv, data = imap_client.search(None, "ALL")
-        if rv != "OK":
-            raise RuntimeError("Unable to search the Email folder: " + rv)
-
-        count = 0
-        for num in data[0].split()[::-1]:
-            count = count + 1
-            if count > 3:
-                break
-            rv, data = imap_client.fetch(num, "(RFC822)")
-            if rv != "OK":
-                raise RuntimeError("Unable to complete due to error message: " + rv)
-
-            msg = email.message_from_bytes(data[0][1])
-
-            x = email.header.make_header(email.header.decode_header(msg["Subject"]))
-            subject = str(x)
-            logger.debug("DEBUG: SUBJECT:", subject)
-
-            x = email.header.make_header(email.header.decode_header(msg["From"]))
-            frm = str(x)
-            logger.debug("DEBUG: FROM:", frm)
-
-            if not re.search("do_not_reply@intuit.com", frm, re.IGNORECASE):
-                continue
-
-            p = re.search(r"(\d\d\d\d\d\d) Mint code", subject)
-            if p:
-                code = p.group(1)
-            elif not re.search("Your Mint Account", subject, re.IGNORECASE):
-                continue
-            else:
-                code = ""
-
-            date_tuple = email.utils.parsedate_tz(msg["Date"])
-            if date_tuple:
-                local_date = datetime.fromtimestamp(email.utils.mktime_tz(date_tuple))
-            else:
-                logger.error("ERROR: FAIL0")
-
-            diff = datetime.now() - local_date
-
-            logger.debug("DEBUG: AGE:", diff.seconds)
-
-            if diff.seconds > 180:
-                continue
-
-            logger.debug("DEBUG: EMAIL HEADER OK")
-
-            if code == "":
-                body = next(msg.walk()).get_payload(None, True).decode()
-                p = re.search(
-                    r"Verification code:<.*?(\d\d\d\d\d\d)\b", body, re.S | re.M
-                )
-                if p:
-                    code = p.group(1)
-                else:
-                    logger.error("FAIL1")
-
-            logger.debug("DEBUG: CODE FROM EMAIL:", code)
-
-            if code != "":
-                break
-
-        logger.debug("DEBUG: CODE FROM EMAIL 2:", code)
-
-        if code != "":
-            logger.debug("DEBUG: CODE FROM EMAIL 3:", code)
-
-            if delete and count > 0:
-                imap_client.store(num, "+FLAGS", "\\Deleted")
-
-            if delete:
-                imap_client.expunge()
-
-            break
-
-    imap_client.logout()
-    return code
+        return imap.EmailCodeRetriever(
+            imap_client, imap_folder, since=since, timeout=timeout, delete=delete
+        ).get_code()
+    finally:
+        if owns_client:
+            imap_client.logout()
 
 
 CHROME_DRIVER_BASE_URL = "https://chromedriver.storage.googleapis.com/"
@@ -233,14 +156,79 @@ def get_latest_chrome_driver_version():
     return latest_request.text
 
 
-def get_stable_chrome_driver(download_directory=os.getcwd()):
+CHROME_DRIVER_METADATA_FILENAME = "chromedriver.json"
+# Seconds between checks for a newer chromedriver release
+DEFAULT_CHROME_DRIVER_VERSION_TTL = 24 * 60 * 60
+
+
+def read_chrome_driver_metadata(download_directory):
+    """
+    Returns the metadata recorded next to a downloaded chromedriver (its
+    ``version`` and the ``checkedAt`` timestamp of the last release check), or
+    None when there is none.
+    """
+    path = os.path.join(download_directory, CHROME_DRIVER_METADATA_FILENAME)
+    try:
+        with open(path) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(metadata, dict) or "version" not in metadata:
+        return None
+    return metadata
+
+
+def write_chrome_driver_metadata(download_directory, version):
+    path = os.path.join(download_directory, CHROME_DRIVER_METADATA_FILENAME)
+    try:
+        with open(path, "w") as f:
+            json.dump({"version": version, "checkedAt": time.time()}, f)
+    except OSError as e:
+        logger.warning(
+            "Unable to write chromedriver metadata to {}: {}".format(path, e)
+        )
+
+
+# Serialises chromedriver checks and downloads, so that browsers started
+# concurrently (e.g. by the batch runner) never replace the driver under each
+# other or launch a half-written one.
+_chrome_driver_lock = threading.Lock()
+
+
+def get_stable_chrome_driver(
+    download_directory=os.getcwd(), version_ttl=DEFAULT_CHROME_DRIVER_VERSION_TTL
+):
+    with _chrome_driver_lock:
+        return _get_stable_chrome_driver(download_directory, version_ttl)
+
+
+def _get_stable_chrome_driver(download_directory, version_ttl):
     chromedriver_name = "chromedriver"
     if sys.platform in ["win32", "win64"]:
         chromedriver_name += ".exe"
 
     local_executable_path = os.path.join(download_directory, chromedriver_name)
+    local_exists = os.path.exists(local_executable_path)
+    metadata = read_chrome_driver_metadata(download_directory) if local_exists else None
+    if (
+        metadata is not None
+        and version_ttl
+        and time.time() - metadata.get("checkedAt", 0) < version_ttl
+    ):
+        # Checked recently, reuse the driver without touching the network.
+        return local_executable_path
 
-    latest_chrome_driver_version = get_latest_chrome_driver_version()
+    try:
+        latest_chrome_driver_version = get_latest_chrome_driver_version()
+    except (requests.RequestException, RuntimeError):
+        if not local_exists:
+            raise
+        logger.warning(
+            "Unable to check for the latest chrome driver, using {}".format(
+                local_executable_path
+            )
+        )
+        return local_executable_path
     version_match = version_pattern.match(latest_chrome_driver_version)
     latest_major_version = None
     if not version_match:
@@ -251,13 +239,22 @@ def get_stable_chrome_driver(download_directory=os.getcwd()):
         )
     else:
         latest_major_version = version_match.groupdict()["major"]
-    if os.path.exists(local_executable_path):
-        major_version = get_chrome_driver_major_version_from_executable(
-            local_executable_path
-        )
+    if local_exists:
+        local_version_match = metadata and version_pattern.match(metadata["version"])
+        if local_version_match:
+            major_version = local_version_match.groupdict()["major"]
+        else:
+            major_version = get_chrome_driver_major_version_from_executable(
+                local_executable_path
+            )
         if major_version == latest_major_version or not latest_major_version:
             # Use the existing chrome driver, as it's already the latest
             # version or the latest version cannot be determined at the moment.
+            if latest_major_version:
+                write_chrome_driver_metadata(
+                    download_directory,
+                    metadata["version"] if metadata else latest_chrome_driver_version,
+                )
             return local_executable_path
         logger.info("Removing old version {} of Chromedriver".format(major_version))
         os.remove(local_executable_path)
@@ -285,6 +282,7 @@ def get_stable_chrome_driver(download_directory=os.getcwd()):
     zip_file = zipfile.ZipFile(io.BytesIO(request.content))
     zip_file.extractall(path=download_directory)
     os.chmod(local_executable_path, 0o755)
+    write_chrome_driver_metadata(download_directory, latest_chrome_driver_version)
     return local_executable_path
 
 
@@ -293,10 +291,14 @@ def _create_web_driver_at_mint_com(
     session_path=None,
     use_chromedriver_on_path=False,
     chromedriver_download_path=os.getcwd(),
+    chromedriver_version_ttl=None,
+    chrome_arguments=None,
 ):
     """
     Handles starting a web driver at mint.com
     """
+    if chromedriver_version_ttl is None:
+        chromedriver_version_ttl = DEFAULT_CHROME_DRIVER_VERSION_TTL
     chrome_options = ChromeOptions()
     if headless:
         chrome_options.add_argument("headless")
@@ -306,17 +308,157 @@ def _create_web_driver_at_mint_com(
         # chrome_options.add_argument("--window-size=1920x1080")
     if session_path is not None:
         chrome_options.add_argument("user-data-dir=%s" % session_path)
+    for argument in chrome_arguments or ():
+        chrome_options.add_argument(argument)
 
     if use_chromedriver_on_path:
         driver = Chrome(options=chrome_options)
     else:
         driver = Chrome(
             options=chrome_options,
-            executable_path=get_stable_chrome_driver(chromedriver_download_path),
+            executable_path=get_stable_chrome_driver(
+                chromedriver_download_path, chromedriver_version_ttl
+            ),
         )
     return driver
 
 
+# Sign in page states, recognised by classify_sign_in_page
+OVERVIEW_STATE = "overview"
+LOGIN_ERROR_STATE = "login_error"
+USER_SELECTION_STATE = "user_selection"
+USERNAME_PASSWORD_STATE = "username_password"
+USERNAME_STATE = "username"
+SAVED_USERNAMES_STATE = "saved_usernames"
+VERIFIED_USER_STATE = "verified_user"
+PASSWORDLESS_STATE = "passwordless"
+MFA_SELECTION_STATE = "mfa_selection"
+MFA_PICKER_STATE = "mfa_picker"
+MFA_STATE = "mfa"
+ACCOUNT_SELECTION_STATE = "account_selection"
+PASSWORD_STATE = "password"
+
+
+def _mfa_css_selectors(label, exclude_label=None):
+    """Joins the ``label`` selectors of all MFA methods, less the ``exclude_label`` ones."""
+    selectors = {
+        selector.strip()
+        for method in MFA_METHODS
+        for selector in method[label].split(",")
+    }
+    if exclude_label is not None:
+        selectors -= set(_mfa_css_selectors(exclude_label).split(", "))
+    return ", ".join(sorted(selectors))
+
+
+# (state, css selector, text the element's own text nodes must contain), in
+# priority order.  The first state with a visible matching element wins.  The
+# MFA picker lists the methods a code can be sent by; the MFA page holds the
+# code input that follows it.
+SIGN_IN_PAGE_STATES = [
+    (LOGIN_ERROR_STATE, "#ius-identifier-first-error", "We can't find anyone with "),
+    (LOGIN_ERROR_STATE, "div", "The password you entered is incorrect."),
+    (LOGIN_ERROR_STATE, "#RecaptchaHeader", None),
+    (USER_SELECTION_STATE, "#ius-link-use-a-different-id-known-device", None),
+    (USERNAME_PASSWORD_STATE, "#ius-userid", None),
+    (
+        USERNAME_STATE,
+        '#ius-identifier, [data-testid="IdentifierFirstIdentifierInput"]',
+        None,
+    ),
+    (SAVED_USERNAMES_STATE, "#ius-option-username, .ius-option-username", None),
+    (VERIFIED_USER_STATE, "#ius-verified-user-update-btn-skip", None),
+    (PASSWORDLESS_STATE, "#skipWebauthnRegistration", None),
+    (MFA_SELECTION_STATE, "#ius-mfa-options-form", None),
+    (MFA_STATE, _mfa_css_selectors(INPUT_CSS_SELECTORS_LABEL), None),
+    (
+        MFA_PICKER_STATE,
+        _mfa_css_selectors(SELECT_CSS_SELECTORS_LABEL, INPUT_CSS_SELECTORS_LABEL),
+        None,
+    ),
+    (ACCOUNT_SELECTION_STATE, '[data-testid="SelectAccountForm"]', None),
+    (
+        PASSWORD_STATE,
+        "#iux-password-confirmation-password, #ius-sign-in-mfa-password-collection-current-password",
+        None,
+    ),
+]
+
+# Seconds to wait for the page to move on after handling a state
+SIGN_IN_STATE_TIMEOUTS = {
+    USER_SELECTION_STATE: 10,
+    USERNAME_PASSWORD_STATE: 10,
+    USERNAME_STATE: 10,
+    SAVED_USERNAMES_STATE: 10,
+    VERIFIED_USER_STATE: 5,
+    PASSWORDLESS_STATE: 5,
+    MFA_SELECTION_STATE: 10,
+    MFA_PICKER_STATE: 20,
+    MFA_STATE: 20,
+    ACCOUNT_SELECTION_STATE: 10,
+    PASSWORD_STATE: 10,
+}
+# Seconds to wait for any known page to appear
+SIGN_IN_PAGE_TIMEOUT = 30
+# Number of times a page may be handled before sign in is abandoned
+MAX_SIGN_IN_STATE_REPEATS = 4
+SIGN_IN_POLL_FREQUENCY = 0.25
+# Seconds to wait for the code input after picking an MFA method
+MFA_INPUT_TIMEOUT = 10
+
+CLASSIFY_SIGN_IN_PAGE_SCRIPT = """
+var overviewUrl = arguments[0], states = arguments[1];
+if (window.location.href.indexOf(overviewUrl) === 0) {
+    return "overview";
+}
+for (var i = 0; i < states.length; i++) {
+    var elements = document.querySelectorAll(states[i][1]);
+    for (var j = 0; j < elements.length; j++) {
+        var element = elements[j];
+        if (!(element.offsetWidth || element.offsetHeight || element.getClientRects().length)) {
+            continue;
+        }
+        if (states[i][2]) {
+            var text = "";
+            for (var k = 0; k < element.childNodes.length; k++) {
+                if (element.childNodes[k].nodeType === Node.TEXT_NODE) {
+                    text += element.childNodes[k].nodeValue;
+                }
+            }
+            if (text.indexOf(states[i][2]) === -1) {
+                continue;
+            }
+        }
+        return states[i][0];
+    }
+}
+return null;
+"""
+
+
+def classify_sign_in_page(driver, url):
+    """
+    Returns the state of the current sign in page (one of the ``*_STATE``
+    constants) or None if the page is not recognised, using a single script
+    execution instead of one element lookup per possible page.
+    """
+    return driver.execute_script(
+        CLASSIFY_SIGN_IN_PAGE_SCRIPT,
+        "{}/".format(url),
+        [list(state) for state in SIGN_IN_PAGE_STATES],
+    )
+
+
+def wait_for_sign_in_page(driver, url, timeout=SIGN_IN_PAGE_TIMEOUT, previous=None):
+    """Waits for a recognised sign in page other than ``previous``."""
+
+    def new_state(driver):
+        state = classify_sign_in_page(driver, url)
+        return state if state != previous else None
+
+    return WebDriverWait(driver, timeout, SIGN_IN_POLL_FREQUENCY).until(new_state)
+
+
 def sign_in(
     email,
     password,
@@ -333,6 +475,9 @@ def sign_in(
     imap_server=None,
     imap_folder="INBOX",
     beta=False,
+    imap_client_future=None,
+    sync_status=None,
+    driver_lock=None,
 ):
     if beta:
         url = constants.MINT_BETA_ROOT_URL
@@ -341,85 +486,147 @@ def sign_in(
     """
     Takes in a web driver and gets it through the Mint sign in process
     """
-    driver.implicitly_wait(20)  # seconds
+    if imap_account and imap_client_future is None:
+        # Log in to IMAP while the browser works through the sign in pages.
+        imap_client_future = imap.connect_in_background(
+            imap_server, imap_account, imap_password
+        )
+    try:
+        return _sign_in(
+            email,
+            password,
+            driver,
+            url,
+            mfa_method,
+            mfa_token,
+            mfa_input_callback,
+            intuit_account,
+            wait_for_sync,
+            wait_for_sync_timeout,
+            fail_if_stale,
+            imap_account,
+            imap_password,
+            imap_server,
+            imap_folder,
+            beta,
+            imap_client_future,
+            sync_status,
+            driver_lock,
+        )
+    finally:
+        if imap_client_future is not None:
+            imap.close_in_background(imap_client_future)
+
+
+def _sign_in(
+    email,
+    password,
+    driver,
+    url,
+    mfa_method,
+    mfa_token,
+    mfa_input_callback,
+    intuit_account,
+    wait_for_sync,
+    wait_for_sync_timeout,
+    fail_if_stale,
+    imap_account,
+    imap_password,
+    imap_server,
+    imap_folder,
+    beta,
+    imap_client_future,
+    sync_status,
+    driver_lock,
+):
+    # Every wait below is explicit, so element lookups must not block.
+    driver.implicitly_wait(0)  # seconds
     driver.get(url)
     if not beta:
-        # Add 1 second delay otherwise an issue occurs when trying to click the sign in button on home page
-        time.sleep(1)
         home_page(driver)
 
-    WebDriverWait(driver, 20).until(
-        expected_conditions.presence_of_element_located(
-            (
-                By.CSS_SELECTOR,
-                "#ius-link-use-a-different-id-known-device, #ius-userid, #ius-identifier, #ius-option-username",
+    def handle_mfa_selection():
+        if mfa_method is None:
+            raise RuntimeError(
+                "Login to Mint failed: choose a Multifactor Method with mfa_method"
             )
+        mfa_selection_page(driver, mfa_method)
+
+    def handle_mfa():
+        mfa_page(
+            driver,
+            mfa_method,
+            mfa_token,
+            mfa_input_callback,
+            imap_account,
+            imap_password,
+            imap_server,
+            imap_folder,
+            imap_client_future,
         )
-    )
-    driver.implicitly_wait(0)  # seconds
 
-    user_selection_page(driver)
-
-    driver.implicitly_wait(1)  # seconds
-    count = 0
-    while not driver.current_url.startswith("{}/".format(url)):
-        try:  # try to enter in credentials if username and password are on same page
-            handle_same_page_username_password(driver, email, password)
-        except (
-            ElementNotInteractableException,
-            ElementNotVisibleException,
-            NoSuchElementException,
-        ):
-            try:  # try to enter in credentials if username and password are on different pages
-                handle_different_page_username_password(driver, email)
-                driver.implicitly_wait(5)  # seconds
-                password_page(driver, password)
-            except (
-                ElementNotInteractableException,
-                ElementNotVisibleException,
-                NoSuchElementException,
-            ):
-                # no need to enter credentials, likely alreadly logged in
-                pass
-            driver.implicitly_wait(1)  # seconds
-
-        # Wait until logged in, just in case we need to deal with MFA.
-
-        handle_login_failures(driver)
-        if not bypass_verified_user_page(driver):
-            # if bypass_verified_user_page was present, then MFA already done
-            bypass_passwordless_login_page(driver)
-            if mfa_method is not None:
-                mfa_selection_page(driver, mfa_method)
-            mfa_page(
-                driver,
-                mfa_method,
-                mfa_token,
-                mfa_input_callback,
-                imap_account,
-                imap_password,
-                imap_server,
-                imap_folder,
-            )
-        account_selection_page(driver, intuit_account)
-        password_page(driver, password)
-        # Give the overview page a chance to actually load.
-        # If it doesn't, then there may be another round of MFA.
-        try:
-            WebDriverWait(driver, 5).until(
-                expected_conditions.url_contains("{}/".format(url))
+    def handle_mfa_picker():
+        if mfa_method is None:
+            raise RuntimeError(
+                "Login to Mint failed: choose a Multifactor Method with mfa_method"
             )
-        except Exception:
-            count += 1
-            if count > 4:
+        handle_mfa()
+
+    handlers = {
+        LOGIN_ERROR_STATE: lambda: handle_login_failures(driver),
+        USER_SELECTION_STATE: lambda: user_selection_page(driver),
+        USERNAME_PASSWORD_STATE: lambda: handle_same_page_username_password(
+            driver, email, password
+        ),
+        USERNAME_STATE: lambda: handle_different_page_username_password(driver, email),
+        SAVED_USERNAMES_STATE: lambda: saved_usernames_page(driver, email),
+        VERIFIED_USER_STATE: lambda: bypass_verified_user_page(driver),
+        PASSWORDLESS_STATE: lambda: bypass_passwordless_login_page(driver),
+        MFA_SELECTION_STATE: handle_mfa_selection,
+        MFA_PICKER_STATE: handle_mfa_picker,
+        MFA_STATE: handle_mfa,
+        ACCOUNT_SELECTION_STATE: lambda: account_selection_page(driver, intuit_account),
+        PASSWORD_STATE: lambda: password_page(driver, password),
+    }
+
+    visits = {}
+    try:
+        state = wait_for_sign_in_page(driver, url)
+        while state != OVERVIEW_STATE:
+            visits[state] = visits.get(state, 0) + 1
+            if visits[state] > MAX_SIGN_IN_STATE_REPEATS:
                 raise RuntimeError(
                     "Login to Mint failed due to timeout in the Multifactor Method Loop"
                 )
+            logger.debug("Handling sign in page: {}".format(state))
+            try:
+                handlers[state]()
+            except STANDARD_MISSING_EXCEPTIONS + (ElementNotInteractableException,):
+                logger.info("Sign in page changed while handling: {}".format(state))
+            try:
+                state = wait_for_sign_in_page(
+                    driver, url, SIGN_IN_STATE_TIMEOUTS[state], previous=state
+                )
+            except TimeoutException:
+                # Still on the same (or an unrecognised) page; classify it again.
+                state = wait_for_sign_in_page(driver, url)
+    except TimeoutException:
+        raise RuntimeError(
+            "Login to Mint failed: timed out waiting for a known sign in page"
+        )
 
     driver.implicitly_wait(20)  # seconds
     # Wait until the overview page has actually loaded, and if wait_for_sync==True, sync has completed.
     status_message = None
-    if wait_for_sync:
+    if wait_for_sync and sync_status is not None:
+        threading.Thread(
+            target=watch_sync,
+            args=(driver, sync_status, wait_for_sync_timeout, fail_if_stale),
+            kwargs={"driver_lock": driver_lock},
+            name="mintapi-sync",
+            daemon=True,
+        ).start()
+    elif wait_for_sync:
         status_message = handle_wait_for_sync(
             driver, wait_for_sync_timeout, fail_if_stale
         )
@@ -428,7 +635,9 @@ def sign_in(
 
 def home_page(driver):
     try:
-        element = driver.find_element(By.LINK_TEXT, "Sign in").click()
+        WebDriverWait(driver, 20).until(
+            expected_conditions.element_to_be_clickable((By.LINK_TEXT, "Sign in"))
+        ).click()
     except WebDriverException:
         logger.info("WebDriverException when clicking Sign In")
 
@@ -476,11 +685,15 @@ def handle_different_page_username_password(driver, email):
 
     # click on username if on the saved usernames page
     except (ElementNotInteractableException, ElementNotVisibleException):
-        username_elements = driver.find_element(By.CLASS_NAME, "ius-option-username")
-        for username_element in username_elements:
-            if username_element.text == email:
-                username_element.click()
-                break
+        saved_usernames_page(driver, email)
+
+
+def saved_usernames_page(driver, email):
+    username_elements = driver.find_elements(By.CLASS_NAME, "ius-option-username")
+    for username_element in username_elements:
+        if username_element.text == email:
+            username_element.click()
+            break
 
 
 def handle_login_failures(driver):
@@ -578,6 +791,7 @@ def mfa_page(
     imap_password,
     imap_server,
     imap_folder,
+    imap_client_future=None,
 ):
     if mfa_method is None:
         mfa_result = search_mfa_method(driver)
@@ -610,6 +824,7 @@ def mfa_page(
             imap_password,
             imap_server,
             imap_folder,
+            imap_client_future,
         )
     else:
         handle_other_mfa(mfa_token_input, mfa_token_button, mfa_input_callback)
@@ -645,17 +860,33 @@ def set_mfa_method(driver, mfa_method):
     )
     mfa_result = list(mfa)[0]
     try:
-        mfa_token_select = driver.find_element(
+        mfa_token_options = driver.find_elements(
             By.CSS_SELECTOR, mfa_result[SELECT_CSS_SELECTORS_LABEL]
-        ).click()
-        mfa_token_input = driver.find_element(
-            By.CSS_SELECTOR, mfa_result[INPUT_CSS_SELECTORS_LABEL]
         )
+        if mfa_token_options:
+            # On the picker: choose the method, then wait for the code input
+            # page to replace it.
+            mfa_token_options[0].click()
+            mfa_token_input = WebDriverWait(
+                driver, MFA_INPUT_TIMEOUT, SIGN_IN_POLL_FREQUENCY
+            ).until(
+                expected_conditions.element_to_be_clickable(
+                    (By.CSS_SELECTOR, mfa_result[INPUT_CSS_SELECTORS_LABEL])
+                )
+            )
+        else:
+            mfa_token_input = driver.find_element(
+                By.CSS_SELECTOR, mfa_result[INPUT_CSS_SELECTORS_LABEL]
+            )
         mfa_token_button = driver.find_element(
             By.CSS_SELECTOR, mfa_result[BUTTON_CSS_SELECTORS_LABEL]
         )
         mfa_method = mfa_result[constants.MFA_METHOD_LABEL]
-    except (NoSuchElementException, ElementNotInteractableException) as e:
+    except (
+        NoSuchElementException,
+        ElementNotInteractableException,
+        TimeoutException,
+    ) as e:
         raise MFAMethodNotAvailableError(
             "The Multifactor Method {} supplied is not available.".format(mfa_method)
         ) from e
@@ -681,14 +912,26 @@ def handle_email_by_imap(
     imap_password,
     imap_server,
     imap_folder,
+    imap_client_future=None,
 ):
+    imap_client = None
+    if imap_client_future is not None:
+        try:
+            imap_client = imap_client_future.result()
+        except RuntimeError as e:
+            logger.warning("Pre-warmed IMAP connection failed, retrying: {}".format(e))
     try:
-        mfa_code = get_email_code(
-            imap_account,
-            imap_password,
-            imap_server,
-            imap_folder,
-        )
+        try:
+            mfa_code = get_email_code(
+                imap_account,
+                imap_password,
+                imap_server,
+                imap_folder,
+                imap_client=imap_client,
+            )
+        except RuntimeError as e:
+            logger.warning("Unable to read the Mint code by IMAP: {}".format(e))
+            mfa_code = None
         if mfa_code is None:
             mfa_code = (mfa_input_callback or input)(DEFAULT_MFA_INPUT_PROMPT)
         submit_mfa_code(mfa_token_input, mfa_token_button, mfa_code)
@@ -791,3 +1034,52 @@ def handle_wait_for_sync(driver, wait_for_sync_timeout, fail_if_stale):
             raise exceptions.StaleDataException
     except (exceptions.StaleDataException):
         sys.exit(1)
+
+
+SYNC_COMPLETE_TEXT = "Account refresh complete"
+# Seconds between two reads of the account status bar
+SYNC_POLL_INTERVAL = 1
+READ_SYNC_STATUS_SCRIPT = """
+var element = document.querySelector(".AccountStatusBar");
+return element ? [element.innerHTML, element.innerText] : null;
+"""
+
+
+def watch_sync(
+    driver, sync_status, wait_for_sync_timeout, fail_if_stale, driver_lock=None
+):
+    """
+    Non-blocking counterpart of `handle_wait_for_sync`, run on a background
+    thread.  Polls the account status bar, reporting its text to
+    ``sync_status`` as progress, until the sync completes or times out.  Each
+    poll is a single script execution made while holding ``driver_lock``, so
+    requests can be sent through the same driver in the meantime.
+    """
+    driver_lock = driver_lock or contextlib.nullcontext()
+    deadline = time.monotonic() + wait_for_sync_timeout
+    try:
+        while time.monotonic() < deadline:
+            with driver_lock:
+                status = driver.execute_script(READ_SYNC_STATUS_SCRIPT)
+            if status:
+                sync_status.set_progress(status[1])
+                if SYNC_COMPLETE_TEXT in status[0]:
+                    sync_status.set_result(status[1])
+                    return
+            time.sleep(SYNC_POLL_INTERVAL)
+    except WebDriverException as e:
+        # Typically the driver was closed before the sync finished.
+        logger.info("Stopped watching the account sync: {}".format(e.msg))
+        sync_status.set_result(None)
+        return
+    except Exception as e:
+        sync_status.set_exception(e)
+        return
+
+    logger.warning(exceptions.STALE_DATA_ERROR_MESSAGE)
+    if fail_if_stale:
+        sync_status.set_exception(
+            exceptions.StaleDataException(exceptions.STALE_DATA_ERROR_MESSAGE)
+        )
+    else:
+        sync_status.set_result(None)
@@ -0,0 +1,227 @@
+"""
+Local store helper classes
+
+Stores keep previously downloaded data so that reports can be answered without
+re-fetching, and so that ``Mint.sync_transactions`` only has to fetch what
+changed since the last run.
+"""
+
+import json
+import os
+import sqlite3
+from abc import ABCMeta, abstractmethod
+
+from mintapi import constants
+
+# Table name and the record key used for the indexed date column, per dataset
+SQLITE_TABLES = {
+    constants.ACCOUNT_KEY: ("accounts", None),
+    constants.BILL_KEY: ("bills", "dueDate"),
+    constants.BUDGET_KEY: ("budgets", "budgetDate"),
+    constants.CATEGORY_KEY: ("categories", None),
+    constants.INVESTMENT_KEY: ("investments", None),
+    constants.TRANSACTION_KEY: ("transactions", "date"),
+}
+
+
+class TransactionStore(metaclass=ABCMeta):
+    """
+    Interface used by ``Mint.sync_transactions``.  The high-water mark is the
+    highest ``lastUpdatedDate`` seen so far.  ``start_date`` and ``end_date``
+    are inclusive ISO dates (YYYY-MM-DD) compared with the transaction date.
+    """
+
+    @abstractmethod
+    def get_high_water_mark(self):
+        pass
+
+    @abstractmethod
+    def set_high_water_mark(self, value):
+        pass
+
+    @abstractmethod
+    def get_transaction_ids(self, start_date=None, end_date=None):
+        pass
+
+    @abstractmethod
+    def upsert_transactions(self, transactions):
+        pass
+
+    @abstractmethod
+    def delete_transactions(self, ids):
+        pass
+
+
+class JSONTransactionStore(TransactionStore):
+    """
+    Keeps transactions keyed by id, plus the sync high-water mark, in a single
+    JSON file.
+
+    Parameters
+    ----------
+    path : str
+        location of the JSON file; it is created on the first write
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    self._data = json.load(f)
+            else:
+                self._data = {"highWaterMark": None, "transactions": {}}
+        return self._data
+
+    def get_high_water_mark(self):
+        return self.data["highWaterMark"]
+
+    def set_high_water_mark(self, value):
+        self.data["highWaterMark"] = value
+        self.save()
+
+    def get_transaction_ids(self, start_date=None, end_date=None):
+        return {
+            id
+            for id, transaction in self.data["transactions"].items()
+            if (start_date is None or transaction.get("date", "") >= start_date)
+            and (end_date is None or transaction.get("date", "") <= end_date)
+        }
+
+    def get_transactions(self):
+        return list(self.data["transactions"].values())
+
+    def upsert_transactions(self, transactions):
+        for transaction in transactions:
+            self.data["transactions"][transaction["id"]] = transaction
+        self.save()
+
+    def delete_transactions(self, ids):
+        for id in ids:
+            self.data["transactions"].pop(id, None)
+        self.save()
+
+    def save(self):
+        # Write to a temporary file first so an interrupted run cannot leave a
+        # truncated store behind.
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(temporary_path, self.path)
+
+
+class SQLiteStore(TransactionStore):
+    """
+    Keeps accounts, bills, budgets, categories, investments and transactions in
+    an indexed SQLite database.  Every table is keyed on the record ``id`` and
+    indexed on date, account id and category id; the full record is kept as
+    JSON in the ``data`` column.
+
+    Parameters
+    ----------
+    path : str
+        location of the database file; it is created if it does not exist
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state "
+                "(key TEXT PRIMARY KEY, value TEXT)"
+            )
+            for table, _ in SQLITE_TABLES.values():
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS {} ("
+                    "id TEXT PRIMARY KEY, "
+                    "date TEXT, "
+                    "account_id TEXT, "
+                    "category_id TEXT, "
+                    "last_updated_date TEXT, "
+                    "data TEXT NOT NULL)".format(table)
+                )
+                for column in ["date", "account_id", "category_id"]:
+                    self.connection.execute(
+                        "CREATE INDEX IF NOT EXISTS {table}_{column}_idx "
+                        "ON {table} ({column})".format(table=table, column=column)
+                    )
+
+    def _to_row(self, record, date_key):
+        category = record.get("category")
+        if isinstance(category, dict):
+            category_id = category.get("id")
+        else:
+            category_id = record.get("categoryId")
+        return (
+            str(record["id"]),
+            record.get(date_key) if date_key else None,
+            record.get("accountId"),
+            category_id,
+            record.get("lastUpdatedDate"),
+            json.dumps(record),
+        )
+
+    def upsert(self, name, records):
+        """Inserts or replaces the records of a dataset, keyed on ``id``."""
+        table, date_key = SQLITE_TABLES[name]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO {} "
+                "(id, date, account_id, category_id, last_updated_date, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)".format(table),
+                (self._to_row(record, date_key) for record in records),
+            )
+
+    def get_records(self, name):
+        table, _ = SQLITE_TABLES[name]
+        return [
+            json.loads(data)
+            for (data,) in self.connection.execute("SELECT data FROM {}".format(table))
+        ]
+
+    def get_high_water_mark(self):
+        row = self.connection.execute(
+            "SELECT value FROM sync_state WHERE key = 'highWaterMark'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water_mark(self, value):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) "
+                "VALUES ('highWaterMark', ?)",
+                (value,),
+            )
+
+    def get_transaction_ids(self, start_date=None, end_date=None):
+        table, _ = SQLITE_TABLES[constants.TRANSACTION_KEY]
+        return {
+            id
+            for (id,) in self.connection.execute(
+                "SELECT id FROM {} WHERE (? IS NULL OR date >= ?) "
+                "AND (? IS NULL OR date <= ?)".format(table),
+                (start_date, start_date, end_date, end_date),
+            )
+        }
+
+    def upsert_transactions(self, transactions):
+        self.upsert(constants.TRANSACTION_KEY, transactions)
+
+    def delete_transactions(self, ids):
+        table, _ = SQLITE_TABLES[constants.TRANSACTION_KEY]
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM {} WHERE id = ?".format(table),
+                ((str(id),) for id in ids),
+            )
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,105 @@
+"""
+Streaming JSON helpers
+
+Mint responses are a JSON object holding a ``metaData`` block and an array of
+records under the endpoint key (e.g. ``Transaction``).  ``iter_json_array``
+decodes that array one element at a time from the response stream, so only a
+single record is held in memory rather than the raw body plus its decoded tree.
+"""
+
+import codecs
+import json
+import re
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class _StreamBuffer:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.done = False
+
+    def fill(self):
+        """Reads the next chunk; returns False once the stream is exhausted."""
+        if self.done:
+            return False
+        for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.utf8.decode(chunk)
+            if chunk:
+                self.text = self.text[self.pos :] + chunk
+                self.pos = 0
+                return True
+        # Raises if the stream ended in the middle of a multi-byte character.
+        self.utf8.decode(b"", final=True)
+        self.done = True
+        return False
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, characters):
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise ValueError(
+                "Expected one of {!r} at offset {} of the response stream, found {!r}".format(
+                    characters, self.pos, character
+                )
+            )
+        self.pos += 1
+        return character
+
+    def decode_value(self):
+        while True:
+            self.peek()
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A value ending exactly at the end of the buffer may be a number
+            # cut off mid-way; only accept it once more input has arrived.
+            if end < len(self.text) or not self.fill():
+                self.pos = end
+                return value
+
+
+def iter_json_array(chunks, key):
+    """
+    Yields the elements of the array stored under ``key`` in a JSON object,
+    decoding incrementally from an iterable of ``bytes`` or ``str`` chunks.
+    Other members of the object are decoded and discarded.  Raises KeyError if
+    the object has no such member.
+    """
+    buffer = _StreamBuffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        raise KeyError(key)
+    while True:
+        name = buffer.decode_value()
+        buffer.expect(":")
+        if name == key:
+            break
+        buffer.decode_value()
+        if buffer.expect(",}") == "}":
+            raise KeyError(key)
+
+    buffer.expect("[")
+    if buffer.peek() == "]":
+        return
+    while True:
+        yield buffer.decode_value()
+        if buffer.expect(",]") == "]":
+            return
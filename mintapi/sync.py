@@ -0,0 +1,59 @@
+"""
+Account sync status
+
+Mint refreshes the linked accounts after every sign in.  With
+``sync_in_background``, sign in returns without waiting for the refresh and a
+``SyncStatus`` reports its progress instead, so that data which does not depend
+on the refresh (categories, budgets) can be fetched meanwhile.
+"""
+
+from concurrent.futures import Future
+
+
+class SyncStatus:
+    """
+    Handle on the account sync running after sign in.
+
+    It can be waited on with ``result()``, given done callbacks, or awaited
+    from asyncio.  The result is the final status bar message, or None if the
+    status could not be determined before the timeout.
+
+    Parameters
+    ----------
+    progress_callback : Optional[Callable[[str], None]], optional
+        called with the status bar text whenever it changes, by default None
+    """
+
+    def __init__(self, progress_callback=None):
+        self.progress_callback = progress_callback
+        self.message = None
+        self._future = Future()
+
+    def set_progress(self, message):
+        if message == self.message:
+            return
+        self.message = message
+        if self.progress_callback is not None:
+            self.progress_callback(message)
+
+    def set_result(self, status_message):
+        self._future.set_result(status_message)
+
+    def set_exception(self, exception):
+        self._future.set_exception(exception)
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Waits for the sync and returns the final status message."""
+        return self._future.result(timeout)
+
+    def add_done_callback(self, fn):
+        """Calls ``fn(self)`` once the sync has finished."""
+        self._future.add_done_callback(lambda future: fn(self))
+
+    def __await__(self):
+        import asyncio
+
+        return asyncio.wrap_future(self._future).__await__()
@@ -0,0 +1,91 @@
+"""
+Transport helper classes
+
+A transport is any object with a ``request(method, url, **kwargs)`` method that
+``Mint.get`` / ``Mint.post`` use to send a request to Mint.  Without one,
+requests are routed through the selenium driver (``seleniumrequests``), which
+synchronises cookies with the browser on every call.  Once signed in, the
+cookies can instead be copied into a pooled, keep-alive ``requests.Session`` so
+the browser is no longer involved.
+"""
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class SessionTransport:
+    """
+    Sends requests through a pooled ``requests.Session``.
+
+    Parameters
+    ----------
+    cookies : List[Dict], optional
+        cookies in the format returned by ``driver.get_cookies()``, by default None
+    headers : Dict, optional
+        headers sent with every request (e.g. the browser user agent), by default None
+    pool_connections : int, optional
+        number of host pools to cache, by default 10
+    pool_maxsize : int, optional
+        maximum number of keep-alive connections per host, by default 10
+    """
+
+    def __init__(
+        self,
+        cookies=None,
+        headers=None,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    ):
+        # requests is only imported once a session transport is in use.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+        if cookies:
+            self.update_cookies(cookies)
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs):
+        """Builds a session transport from the cookies of a signed in driver."""
+        user_agent = driver.execute_script("return navigator.userAgent")
+        return cls(
+            cookies=driver.get_cookies(),
+            headers={"user-agent": user_agent} if user_agent else None,
+            **kwargs
+        )
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def update_cookies(self, cookies):
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+                secure=cookie.get("secure", False),
+            )
+
+    def get_cookies(self):
+        """Returns the cookie jar in the format used by ``driver.get_cookies()``."""
+        return [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "secure": cookie.secure,
+            }
+            for cookie in self.session.cookies
+        ]
+
+    def close(self):
+        self.session.close()
@@ -28,7 +28,10 @@ setuptools.setup(
         "xmltodict",
         "keyring",
     ],
-    python_requires=">=3.6",
+    extras_require={
+        "arrow": ["pyarrow"],
+    },
+    python_requires=">=3.7",
     entry_points=dict(
         console_scripts=[
             "mintapi = mintapi.cli:main",
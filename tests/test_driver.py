@@ -1,12 +1,37 @@
 import mintapi.api
+import mintapi.batch
+import mintapi.cache
 import mintapi.cli
+import mintapi.imap
+import mintapi.columnar
+import mintapi.daemon
+import mintapi.models
+import mintapi.session
+import mintapi.streaming
+import mintapi.sync
 import mintapi.signIn
+import mintapi.transport
+import asyncio
+import copy
+import csv
+import email.utils
+import imaplib
+import importlib.util
+import io
 import json
+import os
 import unittest
 import requests
+import socket
+import subprocess
+import sys
 import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from mintapi import constants
-from unittest.mock import patch, DEFAULT
+from unittest.mock import patch, DEFAULT, MagicMock
+from selenium.common.exceptions import NoSuchElementException
 
 
 accounts_example = {
@@ -255,6 +280,163 @@ class TestMock:
         return Attribute()
 
 
+class SignInDriver:
+    """Fake driver that walks through a list of sign in page states."""
+
+    def __init__(self, states):
+        self.states = list(states)
+        self.scripts = 0
+        self.implicit_waits = []
+
+    def implicitly_wait(self, seconds):
+        self.implicit_waits.append(seconds)
+
+    def get(self, url):
+        pass
+
+    def execute_script(self, script, *args):
+        self.scripts += 1
+        return self.states[0]
+
+    def advance(self, *args):
+        self.states.pop(0)
+
+
+class MFAPickerDriver(SignInDriver):
+    """
+    Fake driver on the email MFA picker.  Picking the method moves to the code
+    input page, whose input only shows up on the second lookup.
+    """
+
+    def __init__(self):
+        super().__init__(
+            [
+                mintapi.signIn.MFA_PICKER_STATE,
+                mintapi.signIn.MFA_STATE,
+                mintapi.signIn.OVERVIEW_STATE,
+            ]
+        )
+        self.option = MagicMock()
+        self.option.click.side_effect = self.advance
+        self.code_input = MagicMock()
+        self.code_button = MagicMock()
+        self.code_button.click.side_effect = self.advance
+        self.input_lookups = 0
+
+    def find_elements(self, by, value):
+        if self.states[0] == mintapi.signIn.MFA_PICKER_STATE and (
+            "challengePickerOption_EMAIL_OTP" in value
+        ):
+            return [self.option]
+        return []
+
+    def find_element(self, by, value):
+        if self.states[0] == mintapi.signIn.MFA_STATE:
+            if value == "#ius-mfa-confirm-code":
+                self.input_lookups += 1
+                if self.input_lookups > 1:
+                    return self.code_input
+            elif "VerifyOtpSubmitButton" in value:
+                return self.code_button
+        raise NoSuchElementException(value)
+
+
+class FakeIMAPClient:
+    """Stand-in for imaplib.IMAP4 serving a list of messages."""
+
+    def __init__(self, messages, capabilities=("IMAP4REV1",)):
+        # one message (subject, date, body) or None arrives per search
+        self.pending = list(messages)
+        self.messages = []
+        self.capabilities = capabilities
+        self.fetched = []
+        self.deleted = []
+
+    def select(self, folder):
+        return "OK", [b"0"]
+
+    def noop(self):
+        return "OK", [b""]
+
+    def search(self, charset, *criteria):
+        self.criteria = criteria
+        message = self.pending.pop(0) if self.pending else None
+        if message is not None:
+            self.messages.append(message)
+        nums = " ".join(str(num) for num in range(1, len(self.messages) + 1))
+        return "OK", [nums.encode()]
+
+    def fetch(self, nums, parts):
+        self.fetched.append((nums, parts))
+        data = []
+        for num in nums.split(b","):
+            subject, date, body = self.messages[int(num) - 1]
+            message = "From: Intuit <do_not_reply@intuit.com>\r\nSubject: {}\r\nDate: {}\r\n\r\n".format(
+                subject, email.utils.format_datetime(date)
+            )
+            if parts == mintapi.imap.BODY_FIELDS:
+                message += body
+            data.extend([(num + b" (BODY[] {1}", message.encode()), b")"])
+        return "OK", data
+
+    def store(self, num, command, flags):
+        self.deleted.append(num)
+
+    def expunge(self):
+        pass
+
+
+class FakeIMAPServer:
+    """
+    Minimal IMAP server on a local socket for testing against imaplib.
+    ``idle_responses`` lists what each IDLE gets: "exists", "quiet" or "reject".
+    """
+
+    def __init__(self, idle_responses):
+        self.idle_responses = list(idle_responses)
+        self.commands = []
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        connection, _ = self.listener.accept()
+        with connection, connection.makefile("rb") as reader:
+            connection.sendall(b"* OK IMAP4rev1 ready\r\n")
+            for line in reader:
+                tag, command = line.split()[:2]
+                self.commands.append(command)
+                if command == b"CAPABILITY":
+                    connection.sendall(
+                        b"* CAPABILITY IMAP4rev1 IDLE\r\n" + tag + b" OK done\r\n"
+                    )
+                elif command == b"IDLE":
+                    response = self.idle_responses.pop(0)
+                    if response == "reject":
+                        connection.sendall(tag + b" BAD unknown command\r\n")
+                        continue
+                    # An untagged response may come before the continuation,
+                    # and new mail in the same packet as it.
+                    greeting = b"* OK still here\r\n+ idling\r\n"
+                    if response == "exists":
+                        greeting += b"* 2 EXISTS\r\n"
+                    connection.sendall(greeting)
+                    self.commands.append(reader.readline().strip())
+                    connection.sendall(tag + b" OK IDLE done\r\n")
+                elif command == b"LOGOUT":
+                    connection.sendall(b"* BYE\r\n" + tag + b" OK done\r\n")
+                    return
+                else:
+                    connection.sendall(tag + b" OK done\r\n")
+
+    def close(self):
+        self.thread.join(5)
+        self.listener.close()
+
+
 class MintApiTests(unittest.TestCase):
     def test_chrome_driver_links(self):
         latest_version = mintapi.signIn.get_latest_chrome_driver_version()
@@ -264,6 +446,194 @@ class MintApiTests(unittest.TestCase):
             )
             self.assertEqual(request.status_code, 200)
 
+    @patch.object(mintapi.signIn, "get_chrome_driver_major_version_from_executable")
+    @patch.object(mintapi.signIn, "get_latest_chrome_driver_version")
+    def test_stable_chrome_driver_is_cached(self, mock_latest, mock_local_version):
+        mock_latest.return_value = "114.0.5735.90"
+        with tempfile.TemporaryDirectory() as download_directory, patch.object(
+            mintapi.signIn.sys, "platform", "linux"
+        ):
+            local_path = os.path.join(download_directory, "chromedriver")
+            open(local_path, "w").close()
+            mock_local_version.return_value = "114"
+
+            # No metadata yet: check the release and record it.
+            self.assertEqual(
+                mintapi.signIn.get_stable_chrome_driver(download_directory),
+                local_path,
+            )
+            self.assertEqual(mock_latest.call_count, 1)
+            self.assertEqual(mock_local_version.call_count, 1)
+            metadata = mintapi.signIn.read_chrome_driver_metadata(download_directory)
+            self.assertEqual(metadata["version"], "114.0.5735.90")
+
+            # Within the TTL: no network call and no subprocess.
+            self.assertEqual(
+                mintapi.signIn.get_stable_chrome_driver(download_directory),
+                local_path,
+            )
+            self.assertEqual(mock_latest.call_count, 1)
+            self.assertEqual(mock_local_version.call_count, 1)
+
+            # TTL expired and offline: fall back to the local driver.
+            mock_latest.side_effect = requests.ConnectionError()
+            self.assertEqual(
+                mintapi.signIn.get_stable_chrome_driver(
+                    download_directory, version_ttl=0
+                ),
+                local_path,
+            )
+            self.assertEqual(mock_latest.call_count, 2)
+            self.assertEqual(mock_local_version.call_count, 1)
+
+    @patch.object(mintapi.signIn, "get_chrome_driver_major_version_from_executable")
+    @patch.object(mintapi.signIn, "get_latest_chrome_driver_version")
+    def test_stable_chrome_driver_is_resolved_one_at_a_time(
+        self, mock_latest, mock_local_version
+    ):
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def latest_version():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return "114.0.5735.90"
+
+        mock_latest.side_effect = latest_version
+        mock_local_version.return_value = "114"
+        with tempfile.TemporaryDirectory() as download_directory, patch.object(
+            mintapi.signIn.sys, "platform", "linux"
+        ):
+            open(os.path.join(download_directory, "chromedriver"), "w").close()
+            threads = [
+                threading.Thread(
+                    target=mintapi.signIn.get_stable_chrome_driver,
+                    args=(download_directory, 0),
+                )
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(mock_latest.call_count, 4)
+        self.assertEqual(peak[0], 1)
+
+    def test_sign_in_dispatches_one_handler_per_page(self):
+        driver = SignInDriver(
+            [
+                mintapi.signIn.USERNAME_STATE,
+                mintapi.signIn.PASSWORD_STATE,
+                mintapi.signIn.MFA_STATE,
+                mintapi.signIn.OVERVIEW_STATE,
+            ]
+        )
+        with patch.multiple(
+            mintapi.signIn,
+            handle_different_page_username_password=DEFAULT,
+            handle_same_page_username_password=DEFAULT,
+            password_page=DEFAULT,
+            mfa_page=DEFAULT,
+            account_selection_page=DEFAULT,
+        ) as handlers:
+            for handler in handlers.values():
+                handler.side_effect = driver.advance
+            mintapi.signIn.sign_in(
+                "test", "test", driver, wait_for_sync=False, beta=True
+            )
+        handlers["handle_different_page_username_password"].assert_called_once()
+        handlers["password_page"].assert_called_once_with(driver, "test")
+        handlers["mfa_page"].assert_called_once()
+        handlers["handle_same_page_username_password"].assert_not_called()
+        handlers["account_selection_page"].assert_not_called()
+        self.assertEqual(driver.implicit_waits[0], 0)
+        self.assertEqual(driver.scripts, 4)
+
+    def test_sign_in_picks_saved_username(self):
+        driver = SignInDriver(
+            [
+                mintapi.signIn.SAVED_USERNAMES_STATE,
+                mintapi.signIn.PASSWORD_STATE,
+                mintapi.signIn.OVERVIEW_STATE,
+            ]
+        )
+        other, mine = MagicMock(text="other@example.com"), MagicMock(text="test")
+        mine.click.side_effect = driver.advance
+        driver.find_elements = MagicMock(return_value=[other, mine])
+        with patch.object(
+            mintapi.signIn, "password_page", side_effect=driver.advance
+        ) as mock_password_page:
+            mintapi.signIn.sign_in(
+                "test", "test", driver, wait_for_sync=False, beta=True
+            )
+        driver.find_elements.assert_called_once_with(
+            mintapi.signIn.By.CLASS_NAME, "ius-option-username"
+        )
+        other.click.assert_not_called()
+        mine.click.assert_called_once()
+        mock_password_page.assert_called_once_with(driver, "test")
+
+    def test_sign_in_walks_mfa_picker_to_code_input(self):
+        driver = MFAPickerDriver()
+        mintapi.signIn.sign_in(
+            "test",
+            "test",
+            driver,
+            mfa_method=constants.MFA_VIA_EMAIL,
+            mfa_input_callback=lambda prompt: "123456",
+            wait_for_sync=False,
+            beta=True,
+        )
+        driver.option.click.assert_called_once()
+        driver.code_input.send_keys.assert_called_once_with("123456")
+        driver.code_button.click.assert_called_once()
+        self.assertEqual(driver.states, [mintapi.signIn.OVERVIEW_STATE])
+
+    @patch.object(mintapi.signIn, "get_email_code", return_value="123456")
+    @patch.object(mintapi.imap, "connect")
+    def test_sign_in_prewarms_imap_connection(self, mock_connect, mock_get_email_code):
+        driver = SignInDriver([mintapi.signIn.MFA_STATE, mintapi.signIn.OVERVIEW_STATE])
+        mfa_input, mfa_button = MagicMock(), MagicMock()
+
+        def mfa_page(driver, *args):
+            # imap_account, ..., imap_client_future are the last five arguments
+            mintapi.signIn.handle_email_by_imap(mfa_input, mfa_button, None, *args[-5:])
+            driver.advance()
+
+        with patch.object(mintapi.signIn, "mfa_page", side_effect=mfa_page):
+            mintapi.signIn.sign_in(
+                "test",
+                "test",
+                driver,
+                mfa_method=constants.MFA_VIA_EMAIL,
+                wait_for_sync=False,
+                imap_account="me",
+                imap_password="secret",
+                imap_server="imap.example.com",
+                beta=True,
+            )
+        imap_client = mock_connect.return_value
+        self.assertIs(mock_get_email_code.call_args[1]["imap_client"], imap_client)
+        mock_connect.assert_called_once_with("imap.example.com", "me", "secret")
+        mfa_input.send_keys.assert_called_once_with("123456")
+        imap_client.logout.assert_called_once()
+
+    @patch.dict(
+        mintapi.signIn.SIGN_IN_STATE_TIMEOUTS, {mintapi.signIn.PASSWORD_STATE: 0}
+    )
+    @patch.object(mintapi.signIn, "password_page")
+    def test_sign_in_gives_up_on_repeated_page(self, mock_password_page):
+        driver = SignInDriver([mintapi.signIn.PASSWORD_STATE])
+        with self.assertRaises(RuntimeError):
+            mintapi.signIn.sign_in("test", "test", driver, beta=True)
+        self.assertEqual(
+            mock_password_page.call_count, mintapi.signIn.MAX_SIGN_IN_STATE_REPEATS
+        )
+
     @patch.object(mintapi.api, "_create_web_driver_at_mint_com")
     @patch.object(mintapi.api, "logger")
     @patch.object(mintapi.api, "sign_in")
@@ -313,6 +683,521 @@ class MintApiTests(unittest.TestCase):
         )
         self.assertTrue("utilization" in credit_report)
 
+    def test_session_transport(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = ["api_key", "user_agent"]
+        driver.get_cookies.return_value = [
+            {"name": "session", "value": "abc", "domain": ".intuit.com", "path": "/"}
+        ]
+        mint = mintapi.Mint()
+        mint.driver = driver
+        transport = mint.use_session_transport()
+        self.assertEqual(transport.session.cookies.get("session"), "abc")
+        self.assertEqual(transport.session.headers["user-agent"], "user_agent")
+        self.assertIn("api_key", mint._get_api_key_header()["authorization"])
+
+        # The browser can be closed once the session has been copied
+        mint.close_driver()
+        driver.quit.assert_called_once()
+        with patch.object(transport.session, "request") as mock_request:
+            mint.get("https://mint.intuit.com/pfm/v1/accounts")
+            mock_request.assert_called_once_with(
+                "GET", "https://mint.intuit.com/pfm/v1/accounts"
+            )
+        self.assertIn("api_key", mint._get_api_key_header()["authorization"])
+        mint.close()
+        self.assertIsNone(mint.transport)
+
+    def test_api_key_header_is_cached(self):
+        driver = MagicMock()
+        driver.execute_script.return_value = "api_key"
+        driver.request.return_value.status_code = 200
+        driver.request.return_value.json.side_effect = lambda: copy.deepcopy(
+            accounts_example
+        )
+        mint = mintapi.Mint()
+        mint.driver = driver
+        self.assertFalse(mint.api_key_header_cached)
+        mint.get_account_data()
+        mint.get_account_data()
+        self.assertTrue(mint.api_key_header_cached)
+        driver.execute_script.assert_called_once()
+
+    def test_api_key_header_refreshed_on_unauthorized(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = ["old_key", "new_key"]
+        unauthorized = MagicMock(status_code=401)
+        authorized = MagicMock(status_code=200)
+        authorized.json.return_value = {"bills": []}
+        driver.request.side_effect = [unauthorized, authorized]
+        mint = mintapi.Mint()
+        mint.driver = driver
+        self.assertEqual(mint.get_bills(), [])
+        self.assertEqual(driver.request.call_count, 2)
+        retry_headers = driver.request.call_args.kwargs["headers"]
+        self.assertIn("new_key", retry_headers["authorization"])
+        self.assertIn("new_key", mint._get_api_key_header()["authorization"])
+        unauthorized.close.assert_called_once()
+
+    def test_save_and_load_session(self):
+        with tempfile.TemporaryDirectory() as session_path:
+            self.assertIsNone(mintapi.session.load_session(session_path))
+            mintapi.session.save_session(
+                session_path, [{"name": "a", "value": "b"}], {"authorization": "x"}
+            )
+            session = mintapi.session.load_session(session_path)
+            self.assertEqual(session["cookies"], [{"name": "a", "value": "b"}])
+            self.assertEqual(session["apiKeyHeader"], {"authorization": "x"})
+
+            mintapi.session.save_session(session_path, [], {}, ttl=-1)
+            self.assertIsNone(mintapi.session.load_session(session_path))
+            self.assertFalse(
+                os.path.exists(mintapi.session.get_session_file(session_path))
+            )
+
+    @patch.object(mintapi.api, "sign_in")
+    @patch.object(mintapi.api, "_create_web_driver_at_mint_com")
+    def test_reuse_saved_session(self, mock_create_driver, mock_sign_in):
+        with tempfile.TemporaryDirectory() as session_path:
+            mintapi.session.save_session(
+                session_path,
+                [{"name": "a", "value": "b"}],
+                {"authorization": "x"},
+            )
+            with patch.object(requests.Session, "request") as mock_request:
+                mock_request.return_value.status_code = 200
+                mint = mintapi.Mint(
+                    "test", "test", session_path=session_path, reuse_session=True
+                )
+            mock_create_driver.assert_not_called()
+            mock_sign_in.assert_not_called()
+            self.assertIsNone(mint.driver)
+            self.assertEqual(mint._get_api_key_header(), {"authorization": "x"})
+
+            # A rejected session falls back to signing in with the browser
+            with patch.object(requests.Session, "request") as mock_request:
+                mock_request.return_value.status_code = 401
+                mint = mintapi.Mint()
+                self.assertFalse(mint.restore_session(session_path))
+            self.assertIsNone(mint.transport)
+            self.assertIsNone(mintapi.session.load_session(session_path))
+
+    @patch.object(mintapi.cli, "Mint")
+    def test_credit_data_skips_saved_session(self, mock_mint):
+        for args, reuse_session in [
+            (["--reuse-session", "--accounts"], True),
+            (["--reuse-session", "--credit-score"], False),
+            (["--reuse-session", "--credit-report"], False),
+        ]:
+            options = mintapi.cli.parse_arguments(args)
+            mintapi.cli.create_mint(options, "test", "test", None)
+            self.assertEqual(mock_mint.call_args[1]["reuse_session"], reuse_session)
+
+    def test_async_mint_gathers_endpoints(self):
+        mint = mintapi.Mint()
+        mint.transport = MagicMock()
+        with patch.multiple(
+            mint,
+            get_account_data=DEFAULT,
+            get_category_data=DEFAULT,
+            get_bills=DEFAULT,
+        ) as mocks:
+            mocks["get_account_data"].return_value = [
+                {"type": "BankAccount", "isActive": True, "currentBalance": 10.0}
+            ]
+            mocks["get_category_data"].return_value = category_example
+            mocks["get_bills"].return_value = []
+
+            async def refresh(async_mint):
+                return await asyncio.gather(
+                    async_mint.get_account_data(limit=10),
+                    async_mint.get_category_data(),
+                    async_mint.get_bills(),
+                )
+
+            async_mint = mintapi.AsyncMint(mint, max_workers=3)
+            accounts, categories, bills = asyncio.run(refresh(async_mint))
+            mocks["get_account_data"].assert_called_once_with(limit=10)
+            self.assertEqual(categories, category_example)
+            self.assertEqual(bills, [])
+            self.assertEqual(asyncio.run(async_mint.get_net_worth_data(accounts)), 10.0)
+            async_mint.close()
+        self.assertIsNone(mint.transport)
+
+    def test_fetch_plan_reuses_account_data_for_net_worth(self):
+        options = mintapi.cli.parse_arguments(
+            ["--accounts", "--net-worth", "--categories"]
+        )
+        mint = MagicMock()
+        mint.get_account_data.return_value = [
+            {"type": "CreditAccount", "isActive": True, "currentBalance": 5.0}
+        ]
+        mint.get_category_data.return_value = category_example
+        mint.get_net_worth_data.side_effect = mintapi.Mint().get_net_worth_data
+        plan = mintapi.cli.build_fetch_plan(mint, options, None, None, None)
+        for max_workers in [1, 4]:
+            mint.get_account_data.reset_mock()
+            results = list(mintapi.cli.run_fetch_plan(plan, max_workers))
+            self.assertEqual(
+                [type for type, _ in results],
+                [
+                    constants.ACCOUNT_KEY,
+                    constants.CATEGORY_KEY,
+                    constants.NET_WORTH_KEY,
+                ],
+            )
+            self.assertEqual(results[2][1], {"net_worth": -5.0})
+            mint.get_account_data.assert_called_once()
+
+        # Accounts are fetched for net worth even when not output
+        options = mintapi.cli.parse_arguments(["--net-worth"])
+        plan = mintapi.cli.build_fetch_plan(mint, options, None, None, None)
+        results = list(mintapi.cli.run_fetch_plan(plan, 2))
+        self.assertEqual(results, [(constants.NET_WORTH_KEY, {"net_worth": -5.0})])
+
+    @patch.object(mintapi.cli, "STREAM_QUEUE_SIZE", 2)
+    def test_fetch_plan_pages_streams_in_workers(self):
+        options = mintapi.cli.parse_arguments(["--transactions", "--trends"])
+        page_threads = []
+
+        def pages(**_):
+            for page in range(3):
+                page_threads.append(threading.current_thread())
+                yield from [{"id": "{}-{}".format(page, i)} for i in range(3)]
+
+        mint = MagicMock()
+        mint.iter_transactions.side_effect = pages
+        mint.iter_trends.side_effect = pages
+        plan = mintapi.cli.build_fetch_plan(mint, options, None, None, None)
+        results = [
+            (type, [record["id"] for record in data])
+            for type, data in mintapi.cli.run_fetch_plan(plan, 2)
+        ]
+        ids = ["{}-{}".format(page, i) for page in range(3) for i in range(3)]
+        self.assertEqual(
+            results,
+            [(constants.TRENDS_KEY, ids), (constants.TRANSACTION_KEY, ids)],
+        )
+        self.assertEqual(len(page_threads), 6)
+        self.assertNotIn(threading.main_thread(), page_threads)
+
+        # An error while paging reaches the writer.
+        mint.iter_transactions.side_effect = requests.exceptions.HTTPError
+        for type, data in mintapi.cli.run_fetch_plan(plan[1:], 2):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                list(data)
+
+    def test_fetch_plan_runs_sync_independent_tasks_first(self):
+        options = mintapi.cli.parse_arguments(["--accounts", "--categories"])
+        events = []
+        mint = MagicMock()
+        mint.get_account_data.side_effect = lambda **_: events.append("accounts")
+        mint.get_category_data.side_effect = lambda **_: events.append("categories")
+        plan = mintapi.cli.build_fetch_plan(mint, options, None, None, None)
+        results = list(
+            mintapi.cli.run_fetch_plan(plan, 1, lambda: events.append("sync"))
+        )
+        self.assertEqual(events, ["categories", "sync", "accounts"])
+        self.assertEqual(
+            [type for type, _ in results],
+            [constants.CATEGORY_KEY, constants.ACCOUNT_KEY],
+        )
+
+        # Attention and credit data need the sync
+        options = mintapi.cli.parse_arguments(
+            ["--attention", "--credit-score", "--categories"]
+        )
+        events = []
+        mint.get_attention.side_effect = lambda: events.append("attention")
+        mint.get_credit_score_data.side_effect = lambda: events.append("credit")
+        plan = mintapi.cli.build_fetch_plan(mint, options, None, None, None)
+        results = list(
+            mintapi.cli.run_fetch_plan(plan, 1, lambda: events.append("sync"))
+        )
+        self.assertEqual(events, ["categories", "sync", "attention", "sync", "credit"])
+        self.assertIn((constants.ATTENTION_KEY, None), results)
+
+        # With several workers, none waits on the sync ahead of them
+        options = mintapi.cli.parse_arguments(
+            ["--accounts", "--transactions", "--budgets", "--categories"]
+        )
+        synced = threading.Event()
+        independent = []
+
+        def fetch_independent(type):
+            def fetch(**_):
+                independent.append(type)
+                if len(independent) == 2:
+                    synced.set()
+
+            return fetch
+
+        mint = MagicMock()
+        mint.get_budget_data.side_effect = fetch_independent("budgets")
+        mint.get_category_data.side_effect = fetch_independent("categories")
+        plan = mintapi.cli.build_fetch_plan(mint, options, None, None, None)
+        results = list(
+            mintapi.cli.run_fetch_plan(plan, 2, lambda: self.assertTrue(synced.wait(5)))
+        )
+        self.assertCountEqual(independent, ["budgets", "categories"])
+        self.assertEqual(len(results), 4)
+
+    @patch.object(mintapi.signIn, "SYNC_POLL_INTERVAL", 0)
+    def test_watch_sync(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = [
+            None,
+            ["<span>Refreshing</span>", "Refreshing"],
+            ["<span>Refreshing</span>", "Refreshing"],
+            [
+                "Account refresh complete. 1 account",
+                "Account refresh complete. 1 account",
+            ],
+        ]
+        progress = []
+        sync_status = mintapi.sync.SyncStatus(progress.append)
+        mintapi.signIn.watch_sync(
+            driver, sync_status, 60, False, driver_lock=threading.Lock()
+        )
+        self.assertTrue(sync_status.done())
+        self.assertEqual(
+            progress, ["Refreshing", "Account refresh complete. 1 account"]
+        )
+
+        async def wait():
+            return await sync_status
+
+        self.assertEqual(asyncio.run(wait()), "Account refresh complete. 1 account")
+
+        # Timed out with fail_if_stale
+        sync_status = mintapi.sync.SyncStatus()
+        mintapi.signIn.watch_sync(driver, sync_status, 0, True)
+        with self.assertRaises(mintapi.exceptions.StaleDataException):
+            sync_status.result()
+
+    def test_daemon(self):
+        first, second = MagicMock(), MagicMock()
+        first.get_account_data.side_effect = RuntimeError("session expired")
+        first._probe_session.return_value = False
+        second.get_account_data.return_value = accounts_example["Account"][:1]
+        second.get_net_worth_data.return_value = 42
+        second.iter_transactions.return_value = iter([{"id": "1"}])
+        mint_factory = MagicMock(side_effect=[first, second])
+
+        daemon = mintapi.daemon.MintDaemon(mint_factory)
+        daemon.sign_in()
+        server = mintapi.daemon.make_server(daemon, port=0, token="secret")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = "http://127.0.0.1:{}".format(server.server_address[1])
+            client = mintapi.daemon.DaemonClient(url, token="secret")
+
+            # The expired session is replaced transparently.
+            accounts = client.get_account_data(limit=10)
+            self.assertEqual(accounts[0]["id"], "id")
+            first.close.assert_called_once()
+            second.get_account_data.assert_called_once_with(limit=10)
+
+            self.assertEqual(client.get_net_worth_data(accounts), 42)
+            self.assertEqual(
+                client.iter_transactions(
+                    date_filter=mintapi.filters.DateFilter.Options.ALL_TIME
+                ),
+                [{"id": "1"}],
+            )
+            second.iter_transactions.assert_called_once_with(
+                date_filter=mintapi.filters.DateFilter.Options.ALL_TIME
+            )
+            with self.assertRaises(mintapi.daemon.DaemonError):
+                client.iter_transactions(date_filter="SOMETIME")
+
+            with self.assertRaises(AttributeError):
+                client.get_transaction_frame
+            with self.assertRaises(mintapi.daemon.DaemonError):
+                client.call("close")
+            with self.assertRaises(mintapi.daemon.DaemonError):
+                mintapi.daemon.DaemonClient(url, token="wrong").get_account_data()
+            with tempfile.TemporaryDirectory() as directory:
+                token_file = os.path.join(directory, "daemon-token")
+                with self.assertRaises(mintapi.daemon.DaemonError):
+                    client = mintapi.daemon.DaemonClient(url, token_file=token_file)
+                    client.get_account_data()
+                mintapi.daemon.write_token_file(token_file, "secret")
+                self.assertEqual(os.stat(token_file).st_mode & 0o777, 0o600)
+                client = mintapi.daemon.DaemonClient(url, token_file=token_file)
+                self.assertEqual(client.get_net_worth_data(accounts), 42)
+            self.assertEqual(mint_factory.call_count, 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+            daemon.close()
+        second.close.assert_called_once()
+        with self.assertRaises(ValueError):
+            mintapi.daemon.make_server(daemon, None, port=0)
+
+    def test_run_batch(self):
+        lock = threading.Lock()
+        running, peak, calls = [0], [0], []
+
+        class FakeMint:
+            def __init__(self, email, password, **kwargs):
+                if password == "wrong":
+                    raise RuntimeError("Could not sign in to Mint")
+                calls.append(kwargs)
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+
+            def get_account_data(self):
+                time.sleep(0.01)
+                return accounts_example["Account"][:1]
+
+            def get_bills(self):
+                return []
+
+            def close(self):
+                with lock:
+                    running[0] -= 1
+
+        profiles = [
+            {"email": "user{}@example.com".format(i), "password": "secret"}
+            for i in range(5)
+        ]
+        profiles[2]["password"] = "wrong"
+        profiles[3]["datasets"] = ["accounts", "bills"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profiles.json")
+            with open(path, "w") as f:
+                json.dump({"profiles": profiles}, f)
+            profiles = mintapi.batch.load_profiles(path)
+
+        results = mintapi.batch.run_batch(
+            profiles, max_browsers=2, memory_limit_mb=512, mint_factory=FakeMint
+        )
+        self.assertEqual(
+            [result.name for result in results],
+            ["user{}@example.com".format(i) for i in range(5)],
+        )
+        self.assertLessEqual(peak[0], 2)
+        self.assertEqual(running[0], 0)
+        self.assertIn("Could not sign in", results[2].error)
+        self.assertEqual(
+            [result.ok for result in results], [True, True, False, True, True]
+        )
+        self.assertEqual(
+            set(results[3].data), {constants.ACCOUNT_KEY, constants.BILL_KEY}
+        )
+        self.assertEqual(set(results[0].data), {constants.ACCOUNT_KEY})
+        self.assertTrue(all(kwargs["headless"] for kwargs in calls))
+        self.assertIn("js-flags=--max-old-space-size=512", calls[0]["chrome_arguments"])
+
+    def test_cli_import_is_lazy(self):
+        # Guards the CLI start-up time: these take most of a second to import
+        # and must only be loaded once they are actually needed.
+        heavy_modules = ["keyring", "pandas", "pyarrow", "requests", "selenium"]
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import json, sys, mintapi.cli; "
+                "print(json.dumps(sorted(m for m in {} if m in sys.modules)))".format(
+                    heavy_modules
+                ),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        self.assertEqual(json.loads(output), [])
+
+    @patch.object(mintapi.imap.time, "sleep")
+    def test_email_code_retriever_polls_headers(self, mock_sleep):
+        since = datetime.now(timezone.utc)
+        client = FakeIMAPClient(
+            [
+                None,
+                ("123456 Mint code", since - timedelta(hours=1), ""),
+                ("654321 Mint code", since, ""),
+            ]
+        )
+        retriever = mintapi.imap.EmailCodeRetriever(client, since=since, timeout=60)
+        self.assertEqual(retriever.get_code(), "654321")
+        self.assertIn('"do_not_reply@intuit.com"', client.criteria)
+        self.assertIn("SINCE", client.criteria)
+        # Only headers were fetched, each message once.
+        self.assertEqual(
+            client.fetched,
+            [
+                (b"1", mintapi.imap.HEADER_FIELDS),
+                (b"2", mintapi.imap.HEADER_FIELDS),
+            ],
+        )
+        self.assertEqual(client.deleted, [b"2"])
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_email_code_retriever_reads_body(self):
+        since = datetime.now(timezone.utc)
+        client = FakeIMAPClient(
+            [("Your Mint Account", since, "Verification code:<b>987654</b>")],
+        )
+        retriever = mintapi.imap.EmailCodeRetriever(client, since=since, delete=False)
+        self.assertEqual(retriever.get_code(), "987654")
+        self.assertEqual(client.fetched[-1], (b"1", mintapi.imap.BODY_FIELDS))
+        self.assertEqual(client.deleted, [])
+
+    @patch.object(mintapi.imap, "idle")
+    def test_email_code_retriever_uses_idle(self, mock_idle):
+        since = datetime.now(timezone.utc)
+        client = FakeIMAPClient(
+            [None, ("123456 Mint code", since, "")], capabilities=("IDLE",)
+        )
+        self.assertEqual(
+            mintapi.imap.EmailCodeRetriever(client, since=since).get_code(), "123456"
+        )
+        mock_idle.assert_called_once()
+
+    def test_idle(self):
+        server = FakeIMAPServer(["exists", "quiet", "reject"])
+        client = imaplib.IMAP4("127.0.0.1", server.port, timeout=5)
+        try:
+            self.assertTrue(mintapi.imap.supports_idle(client))
+            self.assertTrue(mintapi.imap.idle(client, 5))
+            self.assertFalse(mintapi.imap.idle(client, 0.1))
+            with self.assertRaises(imaplib.IMAP4.error):
+                mintapi.imap.idle(client, 5)
+            # imaplib is still in step with the server afterwards.
+            self.assertEqual(client.noop()[0], "OK")
+        finally:
+            client.logout()
+            server.close()
+        self.assertEqual(
+            server.commands,
+            [
+                b"CAPABILITY",
+                b"IDLE",
+                b"DONE",
+                b"IDLE",
+                b"DONE",
+                b"IDLE",
+                b"NOOP",
+                b"LOGOUT",
+            ],
+        )
+
+    @patch.object(mintapi.imap.time, "sleep")
+    @patch.object(mintapi.imap, "idle")
+    def test_email_code_retriever_polls_when_idle_fails(self, mock_idle, mock_sleep):
+        mock_idle.side_effect = imaplib.IMAP4.error("IDLE was not accepted")
+        since = datetime.now(timezone.utc)
+        client = FakeIMAPClient(
+            [None, None, ("123456 Mint code", since, "")], capabilities=("IDLE",)
+        )
+        self.assertEqual(
+            mintapi.imap.EmailCodeRetriever(client, since=since).get_code(), "123456"
+        )
+        mock_idle.assert_called_once()
+        self.assertEqual(mock_sleep.call_count, 1)
+
     def test_config_file(self):
         # verify parsing from config file
         config_file = write_transactions_file()
@@ -338,6 +1223,393 @@ class MintApiTests(unittest.TestCase):
         self.assertTrue("parentId" in transaction_data["category"])
         self.assertTrue("parentName" in transaction_data["category"])
 
+    @patch.object(mintapi.Mint, "_Mint__post_mint_endpoint")
+    def test_get_transaction_data_as_models(self, mock_call_transactions_endpoint):
+        transaction = copy.deepcopy(transactions_example["Transaction"][0])
+        transaction["metaData"] = {"lastUpdatedDate": "2022-03-25T00:11:08Z"}
+        mock_call_transactions_endpoint.side_effect = lambda *args: {
+            "Transaction": [copy.deepcopy(transaction)]
+        }
+        mint = mintapi.Mint()
+        records = mint.get_transaction_data(model=True)
+        dicts = mint.get_transaction_data()
+        self.assertIsInstance(records[0], mintapi.models.Transaction)
+        self.assertFalse(hasattr(records[0], "__dict__"))
+        self.assertEqual(records, dicts)
+        self.assertEqual(records[0].to_dict(), dicts[0])
+        self.assertEqual(records[0].amount, dicts[0]["amount"])
+        self.assertEqual(
+            records[0].get_datetime("date"),
+            datetime.strptime(dicts[0]["date"], "%Y-%m-%d"),
+        )
+        self.assertFalse("metaData" in records[0])
+        with self.assertRaises(KeyError):
+            records[0]["metaData"]
+
+    @patch.object(mintapi.Mint, "_Mint__post_mint_endpoint")
+    def test_iter_transactions(self, mock_call_transactions_endpoint):
+        transaction = {
+            "type": "CashAndCreditTransaction",
+            "metaData": {"lastUpdatedDate": "2022-03-25T00:11:08Z"},
+            "isPending": False,
+        }
+        pages = [
+            [dict(transaction, id=str(i)) for i in range(2)],
+            [dict(transaction, id="2"), dict(transaction, id="3", isPending=True)],
+            [dict(transaction, id="4")],
+        ]
+        mock_call_transactions_endpoint.side_effect = lambda endpoint, payload: {
+            "Transaction": copy.deepcopy(pages[payload.offset // 2])
+        }
+        transactions = list(mintapi.Mint().iter_transactions(page_size=2))
+        self.assertEqual([t["id"] for t in transactions], ["0", "1", "2", "4"])
+        offsets = [
+            call.args[1].offset for call in mock_call_transactions_endpoint.mock_calls
+        ]
+        self.assertEqual(offsets, [0, 2, 4])
+
+        mock_call_transactions_endpoint.reset_mock()
+        transactions = list(
+            mintapi.Mint().iter_transactions(page_size=2, max_records=2)
+        )
+        self.assertEqual([t["id"] for t in transactions], ["0", "1"])
+        mock_call_transactions_endpoint.assert_called_once()
+
+    def test_split_date_range(self):
+        windows = mintapi.api.split_date_range(
+            datetime(2021, 11, 15), datetime(2022, 4, 10), 3
+        )
+        self.assertEqual(
+            windows,
+            [
+                (datetime(2021, 11, 15), datetime(2021, 12, 31)),
+                (datetime(2022, 1, 1), datetime(2022, 3, 31)),
+                (datetime(2022, 4, 1), datetime(2022, 4, 10)),
+            ],
+        )
+        windows = mintapi.api.split_date_range(
+            datetime(2022, 1, 31), datetime(2022, 3, 1), 1
+        )
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(windows[1], (datetime(2022, 2, 1), datetime(2022, 2, 28)))
+
+    @patch.object(mintapi.Mint, "_Mint__post_mint_endpoint")
+    def test_get_sharded_transaction_data(self, mock_call_transactions_endpoint):
+        def transaction(id, date):
+            return {
+                "id": id,
+                "date": date,
+                "type": "CashAndCreditTransaction",
+                "isPending": False,
+                "metaData": {"lastUpdatedDate": "2022-03-25T00:11:08Z"},
+            }
+
+        windows = {
+            "2022-01-15": [transaction("1", "2022-01-20")],
+            "2022-02-01": [
+                transaction("2", "2022-02-03"),
+                transaction("1", "2022-02-01"),
+            ],
+            "2022-03-01": [transaction("3", "2022-03-02")],
+        }
+        mock_call_transactions_endpoint.side_effect = lambda endpoint, payload: {
+            "Transaction": windows[payload.to_dict()["dateFilter"]["startDate"]]
+        }
+        mint = mintapi.Mint()
+        mint.transport = MagicMock()
+        transactions = mint.get_transaction_data(
+            date_filter=mintapi.DateFilter.Options.CUSTOM,
+            start_date="01/15/22",
+            end_date="03/10/22",
+            shard_by="month",
+        )
+        self.assertEqual(mock_call_transactions_endpoint.call_count, 3)
+        self.assertEqual([t["id"] for t in transactions], ["3", "2", "1"])
+        self.assertEqual(len(transactions), 3)
+
+        with self.assertRaises(ValueError):
+            mint.get_transaction_data(shard_by="month")
+
+    @patch.object(mintapi.Mint, "_Mint__post_mint_endpoint")
+    def test_sync_transactions(self, mock_call_transactions_endpoint):
+        def transaction(id, last_updated, date="2022-03-01"):
+            return {
+                "id": id,
+                "date": date,
+                "type": "CashAndCreditTransaction",
+                "isPending": False,
+                "metaData": {"lastUpdatedDate": last_updated},
+            }
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = mintapi.JSONTransactionStore(os.path.join(directory, "store.json"))
+            mock_call_transactions_endpoint.return_value = {
+                "Transaction": [
+                    transaction("1", "2022-03-01T00:00:00Z"),
+                    transaction("2", "2022-03-02T00:00:00Z"),
+                    transaction("old", "2022-01-01T00:00:00Z", date="2022-01-01"),
+                ]
+            }
+            result = mintapi.Mint().sync_transactions(store)
+            self.assertEqual(result, {"inserted": 3, "updated": 0, "deleted": 0})
+            payload = mock_call_transactions_endpoint.call_args.args[1]
+            self.assertEqual(payload.date_filter.date_filter, "ALL_TIME")
+
+            mock_call_transactions_endpoint.return_value = {
+                "Transaction": [
+                    transaction("1", "2022-03-01T00:00:00Z"),
+                    transaction("2", "2022-03-05T00:00:00Z"),
+                    transaction("3", "2022-03-04T00:00:00Z"),
+                ]
+            }
+            store = mintapi.JSONTransactionStore(os.path.join(directory, "store.json"))
+            result = mintapi.Mint().sync_transactions(store, lookback_days=7)
+            self.assertEqual(result, {"inserted": 1, "updated": 1, "deleted": 0})
+            payload = mock_call_transactions_endpoint.call_args.args[1].to_dict()
+            self.assertEqual(payload["dateFilter"]["type"], "CUSTOM")
+            self.assertEqual(payload["dateFilter"]["startDate"], "2022-02-23")
+            self.assertEqual(store.get_high_water_mark(), "2022-03-05T00:00:00Z")
+            self.assertEqual(store.get_transaction_ids(), {"1", "2", "3", "old"})
+
+            # Transactions Mint no longer returns within the window are deleted;
+            # those dated before it are kept.
+            mock_call_transactions_endpoint.return_value = {
+                "Transaction": [
+                    transaction("1", "2022-03-01T00:00:00Z"),
+                    dict(transaction("3", "2022-03-04T00:00:00Z"), isPending=True),
+                ]
+            }
+            result = mintapi.Mint().sync_transactions(store)
+            self.assertEqual(result, {"inserted": 0, "updated": 0, "deleted": 1})
+            self.assertEqual(store.get_transaction_ids(), {"1", "3", "old"})
+            self.assertEqual(
+                store.get_transaction_ids("2022-02-01", "2022-03-31"), {"1", "3"}
+            )
+
+    def test_sqlite_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = mintapi.SQLiteStore(os.path.join(directory, "mint.db"))
+            transactions = [
+                {
+                    "id": "1",
+                    "date": "2022-03-24",
+                    "accountId": "account",
+                    "category": {"id": "category"},
+                    "lastUpdatedDate": "2022-03-25T00:11:08Z",
+                },
+                {"id": "2", "date": "2022-03-25", "accountId": "account"},
+            ]
+            store.upsert(constants.TRANSACTION_KEY, transactions)
+            store.upsert(constants.TRANSACTION_KEY, [dict(transactions[1], amount=1.0)])
+            self.assertEqual(store.get_transaction_ids(), {"1", "2"})
+            rows = store.connection.execute(
+                "SELECT id, category_id FROM transactions "
+                "WHERE account_id = 'account' ORDER BY date"
+            ).fetchall()
+            self.assertEqual(rows, [("1", "category"), ("2", None)])
+            records = store.get_records(constants.TRANSACTION_KEY)
+            self.assertIn(dict(transactions[1], amount=1.0), records)
+            self.assertEqual(store.get_transaction_ids("2022-03-25"), {"2"})
+            store.delete_transactions({"2"})
+            self.assertEqual(store.get_transaction_ids(), {"1"})
+
+            self.assertIsNone(store.get_high_water_mark())
+            store.set_high_water_mark("2022-03-25T00:11:08Z")
+            self.assertEqual(store.get_high_water_mark(), "2022-03-25T00:11:08Z")
+
+            store.upsert(constants.ACCOUNT_KEY, [{"id": "account"}])
+            self.assertEqual(
+                store.get_records(constants.ACCOUNT_KEY), [{"id": "account"}]
+            )
+            store.close()
+
+    @patch.object(mintapi.Mint, "_Mint__get_mint_endpoint")
+    def test_response_cache(self, mock_call_endpoint):
+        mock_call_endpoint.side_effect = lambda *args, **kwargs: copy.deepcopy(
+            {"Category": category_example}
+        )
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = mintapi.cache.ResponseCache(max_entries=2, cache_dir=cache_dir)
+            mint = mintapi.Mint(response_cache=cache)
+            first = mint.get_category_data()
+            second = mint.get_category_data()
+            self.assertEqual(first, second)
+            self.assertFalse("metaData" in second[0])
+            mock_call_endpoint.assert_called_once()
+
+            # Entries survive in the cache directory for the next run
+            mint = mintapi.Mint(
+                response_cache=mintapi.cache.ResponseCache(cache_dir=cache_dir)
+            )
+            self.assertEqual(mint.get_category_data(), first)
+            mock_call_endpoint.assert_called_once()
+
+            mint.get_category_data(limit=10)
+            self.assertEqual(mock_call_endpoint.call_count, 2)
+
+            mint.response_cache.invalidate(constants.CATEGORY_KEY)
+            mint.get_category_data()
+            self.assertEqual(mock_call_endpoint.call_count, 3)
+
+            # Each login has its own entries, readable only by the owner
+            mint.email = "alice@example.com"
+            mint.get_category_data()
+            self.assertEqual(mock_call_endpoint.call_count, 4)
+            mint.email = "bob@example.com"
+            mint.get_category_data()
+            self.assertEqual(mock_call_endpoint.call_count, 5)
+            mint.email = "Alice@example.com"
+            mint.get_category_data()
+            self.assertEqual(mock_call_endpoint.call_count, 5)
+            for filename in os.listdir(cache_dir):
+                mode = os.stat(os.path.join(cache_dir, filename)).st_mode
+                self.assertEqual(mode & 0o777, 0o600)
+
+    def test_response_cache_eviction_and_expiry(self):
+        cache = mintapi.cache.ResponseCache(max_entries=2)
+        cache.set("a", "A", [1], ttl=60)
+        cache.set("b", "B", [2], ttl=60)
+        cache.get("a")
+        cache.set("c", "C", [3], ttl=60)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), [1])
+        cache.set("d", "D", [4], ttl=-1)
+        self.assertIsNone(cache.get("d"))
+
+    def test_iter_json_array(self):
+        document = json.dumps(
+            {
+                "metaData": {"totalSize": 3, "link": [{"href": "]}"}]},
+                "Transaction": [
+                    {"id": str(i), "description": "caf\u00e9"} for i in range(3)
+                ],
+            },
+            ensure_ascii=False,
+        ).encode()
+        for size in [1, 5, len(document)]:
+            chunks = [document[i : i + size] for i in range(0, len(document), size)]
+            records = list(mintapi.streaming.iter_json_array(chunks, "Transaction"))
+            self.assertEqual([r["id"] for r in records], ["0", "1", "2"])
+            self.assertEqual(records[0]["description"], "caf\u00e9")
+        with self.assertRaises(KeyError):
+            list(mintapi.streaming.iter_json_array([b'{"metaData": {}}'], "Trend"))
+
+    def test_iter_transactions_streamed(self):
+        transaction = {
+            "type": "CashAndCreditTransaction",
+            "metaData": {"lastUpdatedDate": "2022-03-25T00:11:08Z"},
+            "isPending": False,
+        }
+        pages = [
+            {"Transaction": [dict(transaction, id=str(i)) for i in range(2)]},
+            {"Transaction": [dict(transaction, id="2")]},
+        ]
+        responses = []
+        for page in pages:
+            response = MagicMock(status_code=200)
+            body = json.dumps(page).encode()
+            response.iter_content.return_value = [body[:10], body[10:]]
+            responses.append(response)
+        mint = mintapi.Mint()
+        mint.transport = MagicMock()
+        mint.transport.request.side_effect = responses
+        mint._api_key_header = {}
+        transactions = mint.iter_transactions(page_size=2, stream=True)
+        self.assertEqual([t["id"] for t in transactions], ["0", "1", "2"])
+        self.assertTrue(mint.transport.request.call_args.kwargs["stream"])
+        for response in responses:
+            response.close.assert_called_once()
+
+    @patch.object(mintapi.Mint, "_Mint__post_mint_endpoint")
+    def test_server_side_transaction_filters(self, mock_call_transactions_endpoint):
+        mock_call_transactions_endpoint.side_effect = lambda *args: {
+            "Transaction": [
+                {
+                    "id": "1",
+                    "type": "InvestmentTransaction",
+                    "isPending": False,
+                    "metaData": {"lastUpdatedDate": "2022-03-25T00:11:08Z"},
+                }
+            ]
+        }
+        mint = mintapi.Mint()
+        # The local filter still applies when Mint ignores the exclusions.
+        self.assertEqual(
+            mint.get_transaction_data(
+                category_ids=["c"], match_all_filters=False, server_side_filters=True
+            ),
+            [],
+        )
+        payload = mock_call_transactions_endpoint.call_args.args[1]
+        search_filters = payload.to_dict()["searchFilters"]
+        self.assertEqual(
+            search_filters[0]["filters"],
+            [
+                {
+                    "type": "TransactionStatusFilter",
+                    "status": "PENDING",
+                    "exclude": True,
+                },
+                {
+                    "type": "TransactionTypeFilter",
+                    "transactionType": "InvestmentTransaction",
+                    "exclude": True,
+                },
+            ],
+        )
+        self.assertEqual(
+            search_filters[1]["filters"],
+            [
+                {
+                    "type": "CategoryIdFilter",
+                    "categoryId": "c",
+                    "includeChildCategories": True,
+                }
+            ],
+        )
+
+        mint.get_transaction_data(include_investment=True)
+        payload = mock_call_transactions_endpoint.call_args.args[1]
+        search_filters = payload.to_dict()["searchFilters"]
+        self.assertEqual(search_filters[0]["filters"], [])
+
+    @patch.object(mintapi.Mint, "_Mint__post_mint_endpoint")
+    def test_get_transaction_frame(self, mock_call_transactions_endpoint):
+        transactions = [
+            {"id": "1", "date": "2022-03-24", "amount": 5, "type": "Cash"},
+            {"id": "2", "date": "2022-03-25", "isPending": True, "type": "Cash"},
+            {"id": "3", "date": "2022-03-26", "type": "InvestmentTransaction"},
+            {
+                "id": "4",
+                "date": "2022-03-27",
+                "amount": -1.5,
+                "isPending": "false",
+                "type": "Cash",
+                "category": {"name": "Income"},
+                "foo": "bar",
+            },
+        ]
+        mock_call_transactions_endpoint.side_effect = lambda *args: {
+            "Transaction": [
+                dict(transaction, metaData={"lastUpdatedDate": "2022-03-28T00:00:00Z"})
+                for transaction in transactions
+            ]
+        }
+        frame = mintapi.Mint().get_transaction_frame()
+        self.assertEqual(list(frame["id"]), ["1", "4"])
+        self.assertEqual(str(frame["amount"].dtype), "float64")
+        self.assertTrue(str(frame["date"].dtype).startswith("datetime64"))
+        self.assertEqual(str(frame["category.name"].dtype), "category")
+        self.assertEqual(frame["date"][1].day, 27)
+        # Fields outside the schema are kept after the typed columns
+        self.assertEqual(list(frame.columns[-2:]), ["lastUpdatedDate", "foo"])
+        self.assertEqual(list(frame["foo"]), [None, "bar"])
+
+        frame = mintapi.Mint().get_transaction_frame(
+            include_investment=True, remove_pending=False
+        )
+        self.assertEqual(len(frame), 4)
+
     @patch.object(mintapi.Mint, "_Mint__get_mint_endpoint")
     def test_get_investment_data(self, mock_call_investments_endpoint):
         mock_call_investments_endpoint.return_value = investments_example
@@ -372,6 +1644,111 @@ class MintApiTests(unittest.TestCase):
         filename = mintapi.cli.format_filename(arguments, None)
         self.assertEqual(filename, None)
 
+    def test_write_csv(self):
+        transaction = copy.deepcopy(transactions_example["Transaction"][0])
+        transaction.pop("metaData", None)
+        records = iter(
+            [transaction, {"id": "2", "amount": 1.5}, {"id": "3", "late": True}]
+        )
+        output = io.StringIO()
+        with self.assertLogs("mintapi", level="WARNING") as logs:
+            mintapi.cli.write_csv(
+                records, output, constants.TRANSACTION_KEY, sample_size=2
+            )
+        self.assertIn("late", logs.output[0])
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["category.parentName"], "Root")
+        self.assertEqual(rows[0]["fiData.inferredCategory.name"], "name")
+        self.assertEqual(rows[1]["amount"], "1.5")
+        self.assertEqual(rows[2]["description"], "")
+        self.assertNotIn("late", rows[2])
+
+        output = io.StringIO()
+        mintapi.cli.write_csv({"net_worth": 5.0}, output, constants.NET_WORTH_KEY)
+        self.assertEqual(output.getvalue().splitlines(), ["net_worth", "5.0"])
+
+    def test_write_ndjson(self):
+        with tempfile.TemporaryDirectory() as directory:
+            options = mintapi.cli.parse_arguments(
+                [
+                    "--transactions",
+                    "--format",
+                    "ndjson",
+                    "--filename",
+                    os.path.join(directory, "current"),
+                ]
+            )
+            filename = mintapi.cli.format_filename(options, constants.TRANSACTION_KEY)
+
+            def records():
+                yield {"id": "1", "amount": 1.0}
+                # The first record is on disk before the next one arrives.
+                with open(filename) as f:
+                    self.assertEqual(f.read(), '{"id":"1","amount":1.0}\n')
+                yield {"id": "2", "category": {"name": "Income"}}
+
+            mintapi.cli.output_data(options, records(), constants.TRANSACTION_KEY)
+            with open(filename) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{"id": "1", "amount": 1.0}, {"id": "2", "category": {"name": "Income"}}],
+        )
+
+    def test_columnar_format_requires_filename(self):
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            mintapi.cli.parse_arguments(["--transactions", "--format", "parquet"])
+
+    @unittest.skipIf(
+        importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed"
+    )
+    def test_columnar_output(self):
+        import pyarrow.parquet
+
+        transactions = [
+            {
+                "id": "1",
+                "date": "2022-03-24",
+                "amount": 420.0,
+                "category": {"id": "c", "name": "Income"},
+                "isPending": "false",
+                "lastUpdatedDate": "2022-03-25T00:11:08Z",
+            },
+            {"id": "2", "date": "2022-04-01", "amount": 1, "unknownKey": "x"},
+        ]
+        table = mintapi.columnar.to_arrow_table(constants.TRANSACTION_KEY, transactions)
+        self.assertEqual(
+            table.schema, mintapi.columnar.get_schema(constants.TRANSACTION_KEY)
+        )
+        self.assertEqual(table["amount"].to_pylist(), [420.0, 1.0])
+        self.assertEqual(table["category.name"].to_pylist(), ["Income", None])
+        self.assertEqual(table["isPending"].to_pylist(), [False, None])
+
+        with tempfile.TemporaryDirectory() as directory:
+            options = mintapi.cli.parse_arguments(
+                [
+                    "--transactions",
+                    "--format",
+                    "parquet",
+                    "--partition-by-month",
+                    "--filename",
+                    os.path.join(directory, "current"),
+                ]
+            )
+            mintapi.cli.output_data(options, transactions, constants.TRANSACTION_KEY)
+            mintapi.cli.output_data(options, {"net_worth": 1}, constants.NET_WORTH_KEY)
+            root = os.path.join(directory, "current_transaction.parquet")
+            self.assertEqual(
+                sorted(os.listdir(root)), ["month=2022-03", "month=2022-04"]
+            )
+            march = pyarrow.parquet.read_table(
+                os.path.join(root, "month=2022-03", "part-0.parquet")
+            )
+            self.assertEqual(march["id"].to_pylist(), ["1"])
+            with open(os.path.join(directory, "current_net_worth.json")) as f:
+                self.assertEqual(json.load(f), {"net_worth": 1})
+
 
 def write_transactions_file():
     config_file = tempfile.NamedTemporaryFile(mode="wt")